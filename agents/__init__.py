@@ -1,12 +1,14 @@
-from smolagents import (
-    DuckDuckGoSearchTool,
-    VisitWebpageTool,
-    WikipediaSearchTool,
-)
+from tools import fetch_webpages, visit_webpage
+from tools.passage_search import PassageSearch
 from tools.text_search import TextSearch
+from tools.web_search import CachedWebSearchTool
 from tools.text_splitter import text_splitter
 from tools.webpage_parser import WebpageParser
-from tools.parse_wikipedia_table import WikipediaParser
+from tools.parse_wikipedia_table import (
+    SnapshotWikipediaSearchTool,
+    WikipediaParser,
+    WikipediaTableParser,
+)
 from tools.open_files import OpenFilesTool
 
 DEFAULT_ARGS = myagent_args = {
@@ -16,12 +18,15 @@ DEFAULT_ARGS = myagent_args = {
     "planning_interval": 3,
     "add_base_tools": True,
     "tools": [
-        DuckDuckGoSearchTool(),
+        CachedWebSearchTool(),
         WikipediaParser(),
-        VisitWebpageTool(),
+        WikipediaTableParser(),
+        visit_webpage,
+        fetch_webpages,
         TextSearch(),
+        PassageSearch(),
         text_splitter,
-        WikipediaSearchTool(
+        SnapshotWikipediaSearchTool(
             content_type="text",
             extract_format="HTML"
         ),
@@ -43,3 +48,15 @@ DEFAULT_ARGS = myagent_args = {
     "num_ctx": 128_000,
     "temperature": 0.2,
 }
+
+
+def build_default_agent():
+    """
+    Builds a `MyAgent` from `DEFAULT_ARGS`.
+
+    Being a module-level function, it can be handed to worker processes, e.g.
+    by `utils.isolation.IsolatedAgent`.
+    """
+    from agents.agent import MyAgent
+
+    return MyAgent(**DEFAULT_ARGS)
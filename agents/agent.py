@@ -1,10 +1,14 @@
 from smolagents import (
     CodeAgent,
-    LiteLLMModel,
     Tool,
 )
 from typing import Callable
 
+from agents.model import ManagedLiteLLMModel
+from utils.llm_cache import LLMResponseCache, get_llm_cache
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+from utils.tracing import StepTracer, get_tracer
+
 
 class MyAgent:
     def __init__(
@@ -22,6 +26,9 @@ class MyAgent:
         step_callbacks: list[Callable] = [],
         max_steps: int = 20,
         verbosity_level: int = 2,
+        rate_limiter: RateLimiter | None = None,
+        llm_cache: LLMResponseCache | None = None,
+        tracer: StepTracer | None = None,
     ):
         """
         Initializes the agent depending on the provider and model ID.
@@ -39,6 +46,12 @@ class MyAgent:
             step_callbacks (list[Callable]): The step callbacks.
             max_steps (int): The maximum steps.
             verbosity_level (int): The verbosity level.
+            rate_limiter (RateLimiter | None): The limiter for model calls. Defaults to
+                the process-wide limiter shared by all agents.
+            llm_cache (LLMResponseCache | None): The cache for model responses. Defaults
+                to the process-wide cache, which is only enabled with `LLM_CACHE_ENABLED`.
+            tracer (StepTracer | None): The tracer recording step, model and tool timings.
+                Defaults to the process-wide tracer, which is only enabled with `TRACE_ENABLED`.
         Returns:
             None: None
         """
@@ -49,14 +62,24 @@ class MyAgent:
         self.planning_interval = planning_interval
         self.num_ctx = num_ctx
         self.temperature = temperature
+        self.tracer = tracer or get_tracer()
+
+        # CodeAgent appends its monitor to this list, so each agent needs its own copy
+        step_callbacks = list(step_callbacks)
+        if self.tracer is not None:
+            tools = self.tracer.wrap_tools(tools)
+            step_callbacks.append(self.tracer.step_callback)
 
-        model = LiteLLMModel(
+        model = ManagedLiteLLMModel(
             model_id=self.model_id,
             api_base=self.api_base,
             api_key=self.api_key,
             num_ctx=self.num_ctx,
             add_base_tools=add_base_tools,
             temperature=self.temperature,
+            rate_limiter=rate_limiter or get_rate_limiter(),
+            cache=llm_cache or get_llm_cache(),
+            tracer=self.tracer,
         )
 
         # Initialize the agent with the specified provider and model ID
@@ -75,17 +98,26 @@ class MyAgent:
 
         print(f"Agent initialized with provider: {provider}, model ID: {model_id}")
 
-    def __call__(self, question: str) -> str:
+    def __call__(
+        self, question: str, task_id: str | None = None, max_steps: int | None = None
+    ) -> str:
         """
         Given a question, run the agent and return the answer.
 
         Args:
             question (str): The question to be answered.
+            task_id (str | None): The task ID the steps are traced under.
+            max_steps (int | None): The step budget for this question. Defaults to
+                the agent's `max_steps`.
         Returns:
             str: The answer to the question.
         """
 
-        final_answer = self.agent.run(question)
+        if self.tracer is not None:
+            with self.tracer.task(task_id):
+                final_answer = self.agent.run(question, max_steps=max_steps)
+        else:
+            final_answer = self.agent.run(question, max_steps=max_steps)
         print(f"Agent received question (last 50 chars): {question[-50:]}...")
         print(f"Agent returning fixed answer: {final_answer}")
         return final_answer
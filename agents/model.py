@@ -0,0 +1,174 @@
+import json
+import time
+
+from smolagents import LiteLLMModel, Tool
+from smolagents.models import ChatMessage
+
+from utils.llm_cache import LLMResponseCache
+from utils.rate_limiter import RateLimiter, retry_after_seconds
+from utils.tracing import StepTracer
+
+
+def estimate_tokens(messages: list[dict]) -> int:
+    """
+    Roughly estimates the prompt tokens of a message list (~4 characters per token).
+
+    Args:
+        messages (list[dict]): The chat messages sent to the model.
+    Returns:
+        int: The estimated number of tokens.
+    """
+    characters = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict):
+                    characters += len(part.get("text") or "")
+    return characters // 4 + 1
+
+
+class ManagedLiteLLMModel(LiteLLMModel):
+    """
+    LiteLLMModel whose calls are throttled by a shared rate limiter and
+    optionally served from a response cache.
+
+    Rate-limit errors from the provider are retried after backing off, honoring
+    the `Retry-After` header when the provider sends one. The completion itself
+    is left to `LiteLLMModel.__call__`.
+    """
+
+    def __init__(
+        self,
+        *args,
+        rate_limiter: RateLimiter | None = None,
+        cache: LLMResponseCache | None = None,
+        tracer: StepTracer | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.tracer = tracer
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        if isinstance(error, self.client.RateLimitError):
+            return True
+        return getattr(error, "status_code", None) == 429
+
+    def _cache_key(
+        self,
+        messages: list[dict],
+        stop_sequences: list[str] | None,
+        grammar: str | None,
+        tools_to_call_from: list[Tool] | None,
+    ) -> str | None:
+        if self.cache is None:
+            return None
+        return self.cache.make_key(
+            messages=messages,
+            model_id=self.model_id,
+            temperature=self.kwargs.get("temperature"),
+            stop_sequences=stop_sequences,
+            num_ctx=self.kwargs.get("num_ctx"),
+            grammar=grammar,
+            tools=[tool.name for tool in tools_to_call_from or []],
+        )
+
+    def _cached_message(
+        self, key: str | None, tools_to_call_from: list[Tool] | None
+    ) -> ChatMessage | None:
+        if key is None:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        self.last_input_token_count = cached["input_tokens"]
+        self.last_output_token_count = cached["output_tokens"]
+        if self.tracer is not None:
+            self.tracer.record_model_call(
+                0.0, self.last_input_token_count, self.last_output_token_count, cached=True
+            )
+        first_message = ChatMessage.from_dict(cached["message"])
+        return self.postprocess_message(first_message, tools_to_call_from)
+
+    def _record_response(
+        self, message: ChatMessage, key: str | None, started_at: float
+    ) -> None:
+        if self.tracer is not None:
+            self.tracer.record_model_call(
+                time.perf_counter() - started_at,
+                self.last_input_token_count,
+                self.last_output_token_count,
+            )
+        if key is not None:
+            self.cache.put(
+                key,
+                {
+                    "message": json.loads(message.model_dump_json()),
+                    "input_tokens": self.last_input_token_count,
+                    "output_tokens": self.last_output_token_count,
+                },
+            )
+
+    def _record_usage(self, estimated_tokens: int) -> None:
+        if self.rate_limiter is not None:
+            self.rate_limiter.record_usage(
+                estimated_tokens,
+                (self.last_input_token_count or 0) + (self.last_output_token_count or 0),
+            )
+
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        return (
+            self.rate_limiter is not None
+            and self._is_rate_limit_error(error)
+            and attempt < self.rate_limiter.max_retries
+        )
+
+    def _backoff(self, error: Exception, attempt: int) -> None:
+        delay = self.rate_limiter.backoff(attempt, retry_after_seconds(error))
+        print(f"Rate limited by {self.model_id}, backing off for {delay:.1f}s.")
+
+    def __call__(
+        self,
+        messages: list[dict],
+        stop_sequences: list[str] | None = None,
+        grammar: str | None = None,
+        tools_to_call_from: list[Tool] | None = None,
+        **kwargs,
+    ) -> ChatMessage:
+        key = self._cache_key(messages, stop_sequences, grammar, tools_to_call_from)
+        cached_message = self._cached_message(key, tools_to_call_from)
+        if cached_message is not None:
+            return cached_message
+
+        estimated_tokens = estimate_tokens(messages)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                # Tokens are reserved once per call, a retry only takes another request slot
+                self.rate_limiter.acquire(estimated_tokens if attempt == 0 else 0)
+            started_at = time.perf_counter()
+            try:
+                message = super().__call__(
+                    messages,
+                    stop_sequences=stop_sequences,
+                    grammar=grammar,
+                    tools_to_call_from=tools_to_call_from,
+                    **kwargs,
+                )
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    if self.rate_limiter is not None:
+                        # A rejected call used none of the tokens reserved for it
+                        self.rate_limiter.record_usage(estimated_tokens, 0)
+                    raise
+                self._backoff(e, attempt)
+                attempt += 1
+                continue
+
+            self._record_response(message, key, started_at)
+            self._record_usage(estimated_tokens)
+            return message
@@ -2,20 +2,33 @@ import os
 import gradio as gr
 import requests
 import pandas as pd
-from agents.agent import MyAgent
 import time
-from tqdm import tqdm
-from prompts.default_prompt import generate_prompt
-from agents import DEFAULT_ARGS
+from agents.agent import MyAgent
+from agents import DEFAULT_ARGS, build_default_agent
+from utils import get_questions, iter_questions
+from utils.attachments import prefetch_attachments
+from utils.checkpoint import AnswerStore
+from utils.http_cache import get_http_cache
+from utils.http_client import http_get, http_post
+from utils.isolation import TASK_TIMEOUT, IsolatedAgent
+from utils.llm_cache import get_llm_cache
+from utils.tracing import get_tracer
+from utils.whisper_models import preload_whisper_model
+from tools.web_search import search_stats
 
 DEFAULT_API_URL = "https://agents-course-unit4-scoring.hf.space"
+MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", default=4))
 
 
 
 def run_and_submit_all(profile: gr.OAuthProfile | None):
     """
     Fetches all questions, runs the BasicAgent on them, submits all answers,
-    and displays the results.
+    and displays the results. Answers are checkpointed as each task finishes,
+    and tasks that already have a stored answer are not run again.
+
+    This is a generator: the status and a growing results table are streamed
+    to the UI as each task completes.
     """
     # --- Determine HF Space Runtime URL and Repo URL ---
     space_id = os.getenv("SPACE_ID")  # Get the SPACE_ID for sending link to the code
@@ -25,19 +38,25 @@ def run_and_submit_all(profile: gr.OAuthProfile | None):
         print(f"User logged in: {username}")
     else:
         print("User not logged in.")
-        return "Please Login to Hugging Face with the button.", None
+        yield "Please Login to Hugging Face with the button.", None
+        return
 
     api_url = DEFAULT_API_URL
     questions_url = f"{api_url}/questions"
-    submit_url = f"{api_url}/submit"
 
-    # 1. Instantiate Agent ( modify this part to create your agent)
+    # 1. Instantiate Agents, one per worker ( modify this part to create your agent)
     try:
-        agent = MyAgent(**DEFAULT_ARGS)
+        if TASK_TIMEOUT:
+            # Each task runs in its own process and is killed past the deadline
+            agents = [IsolatedAgent(build_default_agent) for _ in range(MAX_WORKERS)]
+        else:
+            agents = [MyAgent(**DEFAULT_ARGS) for _ in range(MAX_WORKERS)]
+        store = AnswerStore(DEFAULT_ARGS)
 
     except Exception as e:
         print(f"Error instantiating agent: {e}")
-        return f"Error initializing agent: {e}", None
+        yield f"Error initializing agent: {e}", None
+        return
     # In the case of an app running as a hugging Face space, this link points toward your codebase ( usefull for others so please keep it public)
     agent_code = f"https://huggingface.co/spaces/{space_id}/tree/main"
     print(agent_code)
@@ -45,62 +64,98 @@ def run_and_submit_all(profile: gr.OAuthProfile | None):
     # 2. Fetch Questions
     print(f"Fetching questions from: {questions_url}")
     try:
-        response = requests.get(questions_url, timeout=15)
+        response = http_get(questions_url, timeout=15)
         response.raise_for_status()
         questions_data = response.json()
         if not questions_data:
             print("Fetched questions list is empty.")
-            return "Fetched questions list is empty or invalid format.", None
+            yield "Fetched questions list is empty or invalid format.", None
+            return
         print(f"Fetched {len(questions_data)} questions.")
     except requests.exceptions.RequestException as e:
         print(f"Error fetching questions: {e}")
-        return f"Error fetching questions: {e}", None
+        yield f"Error fetching questions: {e}", None
+        return
     except requests.exceptions.JSONDecodeError as e:
         print(f"Error decoding JSON response from questions endpoint: {e}")
         print(f"Response text: {response.text[:500]}")
-        return f"Error decoding server response for questions: {e}", None
+        yield f"Error decoding server response for questions: {e}", None
+        return
     except Exception as e:
         print(f"An unexpected error occurred fetching questions: {e}")
-        return f"An unexpected error occurred fetching questions: {e}", None
+        yield f"An unexpected error occurred fetching questions: {e}", None
+        return
 
     # 3. Run your Agent
-    results_log = []
-    answers_payload = []
-    print(f"Running agent on {len(questions_data)} questions...")
-    for item in tqdm(
-        questions_data,
-        desc="Agent is answering questions...",
-        total=len(questions_data),
-    ):
-        task_id = item.get("task_id")
-        question_text = item.get("question")
-        file_name = item.get("file_name")
-        prompt = generate_prompt(question_text, file_name)
-        if not task_id or question_text is None:
-            print(f"Skipping item with missing task_id or question: {item}")
-            continue
-        try:
-            submitted_answer = agent(prompt)
-            time.sleep(60)  # to avoid rate limiting
-            answers_payload.append(
-                {"task_id": task_id, "submitted_answer": submitted_answer}
-            )
-            results_log.append(
-                {
-                    "Task ID": task_id,
-                    "Question": question_text,
-                    "Submitted Answer": submitted_answer,
-                }
-            )
-        except Exception as e:
-            print(f"Error running agent on task {task_id}: {e}")
-            results_log.append(
-                {
-                    "Task ID": task_id,
-                    "Question": question_text,
-                    "Submitted Answer": f"AGENT ERROR: {e}",
-                }
-            )
+    # Attachments are on disk before the agents start, isolated workers included
+    prefetch_attachments(questions_data)
+    if not TASK_TIMEOUT:
+        # Isolated workers load their own model, so only in-process agents benefit
+        preload_whisper_model(questions_data)
+    print(
+        f"Running agent on {len(questions_data)} questions with {MAX_WORKERS} workers..."
+    )
+    results_log = {}
+    run_start = time.perf_counter()
+    for index, result in iter_questions(agents, questions_data, store):
+        if result is not None:
+            results_log[index] = result[1]
+        status = (
+            f"Answered {len(results_log)}/{len(questions_data)} questions "
+            f"({time.perf_counter() - run_start:.0f}s elapsed)..."
+        )
+        yield status, pd.DataFrame([results_log[i] for i in sorted(results_log)])
+    print(f"Web search: {search_stats()}")
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        print(f"HTTP response cache: {http_cache.stats()}")
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        print(f"LLM response cache: {llm_cache.stats()}")
+    tracer = get_tracer()
+    if tracer is not None:
+        print(f"Trace written to {tracer.path}\n{tracer.summary()}")
+
+    # 4. Submit the answers recorded in the store
+    yield "Agent finished. Submitting answers...", pd.DataFrame(
+        [results_log[i] for i in sorted(results_log)]
+    )
+    yield submit_questions(profile, questions_data)
+
+
+def submit_stored_answers(profile: gr.OAuthProfile | None):
+    """
+    Submits the answers recorded in the answer store, so that a failed
+    submission can be retried without running the agent again.
+    """
+    questions_data = get_questions()
+    if not questions_data:
+        return "Could not fetch the questions to submit answers for.", None
+    return submit_questions(profile, questions_data)
+
+
+def submit_questions(profile: gr.OAuthProfile | None, questions_data: list[dict]):
+    """
+    Submits the stored answers to the given questions.
+
+    Only the answer to each question's current prompt is sent: a task whose
+    latest attempt failed, or whose prompt changed since it was answered, is
+    left out rather than submitted with a stale answer.
+    """
+    space_id = os.getenv("SPACE_ID")
+
+    if profile:
+        username = f"{profile.username}"
+    else:
+        print("User not logged in.")
+        return "Please Login to Hugging Face with the button.", None
+
+    submit_url = f"{DEFAULT_API_URL}/submit"
+    agent_code = f"https://huggingface.co/spaces/{space_id}/tree/main"
+
+    store = AnswerStore(DEFAULT_ARGS)
+    answers_payload = store.answers(questions_data)
+    results_log = store.results_log(questions_data)
 
     if not answers_payload:
         print("Agent did not produce any answers to submit.")
@@ -118,7 +173,7 @@ def run_and_submit_all(profile: gr.OAuthProfile | None):
     # 5. Submit
     print(f"Submitting {len(answers_payload)} answers to: {submit_url}")
     try:
-        response = requests.post(submit_url, json=submission_data, timeout=60)
+        response = http_post(submit_url, json=submission_data, timeout=60)
         response.raise_for_status()
         result_data = response.json()
         final_status = (
@@ -169,6 +224,7 @@ with gr.Blocks() as demo:
         1.  Please clone this space, then modify the code to define your agent's logic, the tools, the necessary packages, etc ...
         2.  Log in to your Hugging Face account using the button below. This uses your HF username for submission.
         3.  Click 'Run Evaluation & Submit All Answers' to fetch questions, run your agent, submit answers, and see the score.
+        4.  Answers are saved as each question finishes. If a run is interrupted, running again skips the questions already answered, and 'Submit Stored Answers' resubmits them without running the agent.
 
         ---
         **Disclaimers:**
@@ -180,6 +236,7 @@ with gr.Blocks() as demo:
     gr.LoginButton()
 
     run_button = gr.Button("Run Evaluation & Submit All Answers")
+    submit_button = gr.Button("Submit Stored Answers")
 
     status_output = gr.Textbox(
         label="Run Status / Submission Result", lines=5, interactive=False
@@ -188,6 +245,7 @@ with gr.Blocks() as demo:
     results_table = gr.DataFrame(label="Questions and Agent Answers", wrap=True)
 
     run_button.click(fn=run_and_submit_all, outputs=[status_output, results_table])
+    submit_button.click(fn=submit_stored_answers, outputs=[status_output, results_table])
 
 if __name__ == "__main__":
     print("\n" + "-" * 30 + " App Starting " + "-" * 30)
@@ -215,4 +273,5 @@ if __name__ == "__main__":
     print("-" * (60 + len(" App Starting ")) + "\n")
 
     print("Launching Gradio Interface for Basic Agent Evaluation...")
-    demo.launch(debug=True, share=False)
+    # The queue streams the updates yielded by run_and_submit_all to the browser
+    demo.queue().launch(debug=True, share=False)
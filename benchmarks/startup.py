@@ -0,0 +1,80 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported until a tool actually needs them
+HEAVY_MODULES: list[str] = ["torch", "whisper", "transformers", "selenium", "helium"]
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "heavy_modules": [m for m in {heavy_modules!r} if m in sys.modules],
+}}))
+"""
+
+
+def measure_import(module: str, repeat: int = 3) -> dict:
+    """
+    Imports a module in fresh interpreters and measures its cost.
+
+    Args:
+        module (str): The module to import, e.g. "agents".
+        repeat (int): The number of fresh interpreters to average over.
+    Returns:
+        dict: The median import time, peak RSS and heavy modules that were loaded.
+    """
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy_modules=HEAVY_MODULES)],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        # The probe result is the last line; importing the app may print before it
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "max_rss_mb": statistics.median(run["max_rss_mb"] for run in runs),
+        "heavy_modules": runs[-1]["heavy_modules"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startup benchmark for `import agents` and `import app`.")
+    parser.add_argument("--modules", nargs="+", default=["agents", "app"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if any import is slower.")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="Fail if any import uses more memory.")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        print(
+            f"import {module}: {result['seconds']:.2f}s, "
+            f"peak RSS {result['max_rss_mb']:.0f} MB, "
+            f"heavy modules loaded: {result['heavy_modules'] or 'none'}"
+        )
+        if result["heavy_modules"]:
+            failures.append(f"import {module} loads {', '.join(result['heavy_modules'])}")
+        if args.max_seconds is not None and result["seconds"] > args.max_seconds:
+            failures.append(f"import {module} took {result['seconds']:.2f}s > {args.max_seconds}s")
+        if args.max_rss_mb is not None and result["max_rss_mb"] > args.max_rss_mb:
+            failures.append(f"import {module} used {result['max_rss_mb']:.0f} MB > {args.max_rss_mb} MB")
+
+    if failures:
+        print("Startup regressions:\n" + "\n".join(failures))
+        sys.exit(1)
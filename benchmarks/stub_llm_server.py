@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_URL_PATH: str = "/fixtures/article.html"
+
+PLAN_RESPONSE = """## 1. Facts survey
+The answer is in the reference page.
+
+## 2. Plan
+1. Visit the reference page.
+2. Return the answer.
+<end_plan>"""
+
+TOOL_STEP_RESPONSE = """Thought: I will read the reference page.
+Code:
+```py
+page = visit_webpage(url="{base_url}/fixtures/article.html")
+print(page[:500])
+```<end_code>"""
+
+FINAL_STEP_RESPONSE = """Thought: I have the information I need.
+Code:
+```py
+final_answer("stub answer")
+```<end_code>"""
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """
+    An OpenAI-compatible chat completions server returning scripted CodeAgent turns.
+
+    Planning calls get a fixed plan, the first action step visits a fixture page
+    served by this same server, and the next step calls `final_answer`. The
+    server also counts requests and the time spent answering them.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """
+        Args:
+            host (str): The interface to listen on.
+            port (int): The port to listen on; 0 picks a free port.
+            latency (float): Seconds added to every completion to simulate the model.
+        """
+        super().__init__((host, port), StubLLMHandler)
+        self.latency = latency
+        self.requests_served = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def completion_text(self, body: dict) -> str:
+        stop = body.get("stop") or []
+        if "<end_plan>" in stop:
+            return PLAN_RESPONSE
+        # The system prompt's examples contain "Observation:" too, so look for our own tool call
+        visited = any(
+            FIXTURE_URL_PATH in _message_text(message) for message in body.get("messages", [])
+        )
+        if not visited:
+            return TOOL_STEP_RESPONSE.format(base_url=self.base_url)
+        return FINAL_STEP_RESPONSE
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    server: StubLLMServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/fixtures/"):
+            path = os.path.join(FIXTURES_DIR, os.path.basename(self.path))
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    return self._send(200, f.read(), "text/html; charset=utf-8")
+        if self.path.rstrip("/") == "/v1/models":
+            body = {"object": "list", "data": [{"id": "stub", "object": "model"}]}
+            return self._send(200, json.dumps(body).encode(), "application/json")
+        self._send(404, b"Not found", "text/plain")
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send(404, b"Not found", "text/plain")
+
+        start = time.perf_counter()
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        text = self.server.completion_text(body)
+        for stop in body.get("stop") or []:
+            if stop in text:
+                text = text[: text.index(stop)]
+        prompt_tokens = sum(len(_message_text(m)) for m in body.get("messages", [])) // 4
+        response = {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(text) // 4,
+                "total_tokens": prompt_tokens + len(text) // 4,
+            },
+        }
+        self._send(200, json.dumps(response).encode(), "application/json")
+
+        with self.server._lock:
+            self.server.requests_served += 1
+            self.server.busy_seconds += time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the stub LLM server standalone.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(port=args.port, latency=args.latency)
+    print(f"Stub LLM server listening on {server.base_url}/v1")
+    server.serve_forever()
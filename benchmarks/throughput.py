@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+# Add the parent directory to the Python path so modules can be found
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep litellm from fetching its model cost map over the network
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from benchmarks.stub_llm_server import StubLLMServer
+from agents import DEFAULT_ARGS
+from agents.agent import MyAgent
+from utils import run_questions
+from utils.rate_limiter import RateLimiter
+
+QUESTIONS_FILEPATH: str = os.getenv("QUESTIONS_FILEPATH", default="metadata.jsonl")
+
+
+class StepCounter:
+    """Step callback counting the action steps run by all agents."""
+
+    def __init__(self):
+        self.steps = 0
+
+    def __call__(self, memory_step) -> None:
+        self.steps += 1
+
+
+def run_benchmark(questions: list[dict], workers: int, latency: float) -> dict:
+    """
+    Runs the questions end to end against the stub LLM server.
+
+    Args:
+        questions (list[dict]): The questions to run.
+        workers (int): The number of concurrent agents.
+        latency (float): Simulated model latency per completion, in seconds.
+    Returns:
+        dict: Throughput, per-step overhead and memory figures.
+    """
+    server = StubLLMServer(latency=latency)
+    server.start()
+    counter = StepCounter()
+    agent_args = {
+        **DEFAULT_ARGS,
+        "model_id": "openai/stub",
+        "api_base": f"{server.base_url}/v1",
+        "api_key": "stub",
+        "step_callbacks": [counter],
+        "verbosity_level": 0,
+        # The stub has no quota, so the limiter would only add noise
+        "rate_limiter": RateLimiter(requests_per_minute=0, tokens_per_minute=0),
+    }
+
+    tracemalloc.start()
+    agents = [MyAgent(**agent_args) for _ in range(workers)]
+    start = time.perf_counter()
+    answers_payload, results_log = run_questions(agents, questions)
+    elapsed = time.perf_counter() - start
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    server.shutdown()
+    server.server_close()
+
+    # Time not spent waiting on the (stub) model, spread over every step run
+    orchestration_seconds = elapsed - server.busy_seconds / workers
+    return {
+        "questions": len(questions),
+        "answered": len(answers_payload),
+        "workers": workers,
+        "seconds": elapsed,
+        "tasks_per_second": len(questions) / elapsed,
+        "steps": counter.steps,
+        "model_calls": server.requests_served,
+        "overhead_ms_per_step": 1000 * orchestration_seconds / max(counter.steps, 1),
+        "peak_traced_mb": peak_traced / 2**20,
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Offline throughput benchmark of the question runner, agent and tools."
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated model latency (s).")
+    parser.add_argument("--limit", type=int, default=None, help="Only run the first N questions.")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines.")
+    args = parser.parse_args()
+
+    with open(QUESTIONS_FILEPATH, "r") as f:
+        questions = json.load(f)[: args.limit]
+
+    for workers in args.workers:
+        result = run_benchmark(questions, workers, args.latency)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print(
+                f"workers={result['workers']}: {result['answered']}/{result['questions']} answered "
+                f"in {result['seconds']:.2f}s ({result['tasks_per_second']:.2f} tasks/s), "
+                f"{result['steps']} steps, {result['overhead_ms_per_step']:.1f} ms overhead/step, "
+                f"peak traced {result['peak_traced_mb']:.1f} MB, max RSS {result['max_rss_mb']:.0f} MB"
+            )
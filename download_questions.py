@@ -1,4 +1,5 @@
 from utils import get_questions
+from utils.attachments import prefetch_attachments
 import json
 import os
 
@@ -13,3 +14,4 @@ if __name__ == "__main__":
         json.dump(questions, f, indent=4)
 
     print(f"Saved {len(questions)} questions to {QUESTIONS_FILEPATH}")
+    prefetch_attachments(questions)
@@ -1,21 +1,29 @@
-from agents.agent import MyAgent
 from utils import run_agent
+from utils.attachments import prefetch_attachments
+from utils.checkpoint import AnswerStore
+from utils.isolation import TASK_TIMEOUT, IsolatedAgent
+from utils.http_cache import get_http_cache
+from utils.llm_cache import get_llm_cache
+from utils.tracing import get_tracer
+from utils.whisper_models import preload_whisper_model
+from tools.web_search import search_stats
 from smolagents import (
     DuckDuckGoSearchTool,
     # WikipediaSearchTool,
-    VisitWebpageTool,
 )
+from tools import visit_webpage
 from tools.text_search import TextSearch
 from tools.text_splitter import text_splitter
 from tools.webpage_parser import WebpageParser
 from tools.parse_wikipedia_table import WikipediaParser
 from tools.open_files import OpenFilesTool
 from prompts.default_prompt import generate_prompt
-from agents import DEFAULT_ARGS
+from agents import DEFAULT_ARGS, build_default_agent
 
 
 import os
 import json
+from functools import partial
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,6 +33,7 @@ OLLAMA_MODEL_ID: str = os.getenv("OLLAMA_MODEL_ID", default="gemma3:12b-it-qat")
 OLLAMA_API_BASE: str = os.getenv("OLLAMA_API_BASE", default="http://localhost:11434")
 OLLAMA_API_KEY: str | None = os.getenv("GOOGLE_AI_STUDIO_API_KEY")
 OLLAMA_NUM_CTX: int = int(os.getenv("OLLAMA_NUM_CTX", default=8192))
+MAX_WORKERS: int = int(os.getenv("MAX_WORKERS", default=1))
 
 
 myagent_args = {
@@ -35,7 +44,7 @@ myagent_args = {
     "tools": [
         DuckDuckGoSearchTool(),
         WikipediaParser(),
-        VisitWebpageTool(),
+        visit_webpage,
         TextSearch(),
         text_splitter,
         WebpageParser(),
@@ -60,7 +69,11 @@ myagent_args = {
 print(f"Using args: {DEFAULT_ARGS}")
 
 if __name__ == "__main__":
-    agent = MyAgent(**DEFAULT_ARGS)
+    if TASK_TIMEOUT:
+        agent_factory = partial(IsolatedAgent, build_default_agent)
+    else:
+        agent_factory = build_default_agent
+    agent = agent_factory()
 
     with open(QUESTIONS_FILEPATH, "r") as f:
         questions = json.load(f)
@@ -70,6 +83,25 @@ if __name__ == "__main__":
     file_name = question.get("file_name")
     prompt = generate_prompt(question_text, file_name)
 
-    answers = run_agent(agent, [questions[0]])
+    prefetch_attachments([questions[0]])
+    if not TASK_TIMEOUT:
+        preload_whisper_model([questions[0]])
+    answers = run_agent(
+        agent,
+        [questions[0]],
+        max_workers=MAX_WORKERS,
+        agent_factory=agent_factory,
+        store=AnswerStore(DEFAULT_ARGS),
+    )
     print("Answers:", answers)
+    print(f"Web search: {search_stats()}")
+    http_cache = get_http_cache()
+    if http_cache is not None:
+        print(f"HTTP response cache: {http_cache.stats()}")
+    llm_cache = get_llm_cache()
+    if llm_cache is not None:
+        print(f"LLM response cache: {llm_cache.stats()}")
+    tracer = get_tracer()
+    if tracer is not None:
+        print(f"Trace written to {tracer.path}\n{tracer.summary()}")
     print("Finished running the agent.")
@@ -1,34 +1,197 @@
+import os
 import re
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+from urllib.parse import urlsplit
 from markdownify import markdownify
 from requests.exceptions import RequestException
 from smolagents import tool
+from utils.http_cache import cached_get, normalize_url, ttl_bucket
+
+VISIT_WEBPAGE_MAX_BYTES: int = int(os.getenv("VISIT_WEBPAGE_MAX_BYTES", default=2 * 1024 * 1024))
+VISIT_WEBPAGE_PAGE_CHARS: int = int(os.getenv("VISIT_WEBPAGE_PAGE_CHARS", default=10_000))
+VISIT_WEBPAGE_CACHE_SIZE: int = int(os.getenv("VISIT_WEBPAGE_CACHE_SIZE", default=64))
+# The parsed pages are not revalidated against the HTTP cache, so they are only reused this long
+VISIT_WEBPAGE_CACHE_TTL: float = float(os.getenv("VISIT_WEBPAGE_CACHE_TTL", default=600))
+FETCH_WEBPAGES_MAX_URLS: int = int(os.getenv("FETCH_WEBPAGES_MAX_URLS", default=10))
+FETCH_WEBPAGES_MAX_WORKERS: int = int(os.getenv("FETCH_WEBPAGES_MAX_WORKERS", default=8))
+FETCH_WEBPAGES_PER_HOST: int = int(os.getenv("FETCH_WEBPAGES_PER_HOST", default=2))
+FETCH_WEBPAGES_DEADLINE: float = float(os.getenv("FETCH_WEBPAGES_DEADLINE", default=20))
+FETCH_WEBPAGES_EXCERPT_CHARS: int = int(os.getenv("FETCH_WEBPAGES_EXCERPT_CHARS", default=1500))
+
+# Only these are converted to markdown; anything else is aborted before its body is downloaded
+HTML_CONTENT_TYPES: tuple[str, ...] = ("text/html", "application/xhtml+xml", "text/plain")
+
+
+class UnsupportedContentError(ValueError):
+    """Raised when a URL does not point to an HTML page."""
+
+
+def paginate(text: str, page_chars: int) -> list[str]:
+    """
+    Splits text into pages of at most `page_chars` characters.
+
+    Pages end on a paragraph break, or failing that a line break, when one
+    falls in the second half of the page.
+
+    Args:
+        text (str): The text to split.
+        page_chars (int): The maximum length of a page.
+    Returns:
+        list[str]: The pages, at least one.
+    """
+    pages = []
+    while len(text) > page_chars:
+        cut = text.rfind("\n\n", page_chars // 2, page_chars)
+        if cut == -1:
+            cut = text.rfind("\n", page_chars // 2, page_chars)
+        if cut == -1:
+            cut = page_chars
+        pages.append(text[:cut].strip())
+        text = text[cut:].lstrip()
+    pages.append(text.strip())
+    return pages
+
+
+@lru_cache(maxsize=VISIT_WEBPAGE_CACHE_SIZE)
+def _webpage_pages(url: str, ttl_window: int = 0) -> tuple[tuple[str, ...], bool]:
+    """
+    Downloads a page and converts it to paginated markdown, once per URL and TTL window.
+
+    Args:
+        url (str): The normalized URL of the page.
+        ttl_window (int): The `ttl_bucket` window, so the page is fetched again once it ends.
+    Returns:
+        tuple[tuple[str, ...], bool]: The markdown pages and whether the download was truncated.
+    """
+    response = cached_get(
+        url, max_bytes=VISIT_WEBPAGE_MAX_BYTES, content_types=HTML_CONTENT_TYPES
+    )
+    response.raise_for_status()  # Raise an exception for bad status codes
+    if response.rejected:
+        raise UnsupportedContentError(response.headers.get("Content-Type"))
+
+    # Convert the HTML content to Markdown
+    markdown_content = markdownify(response.text).strip()
+
+    # Remove multiple line breaks
+    markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
+
+    return tuple(paginate(markdown_content, VISIT_WEBPAGE_PAGE_CHARS)), response.truncated
 
 
 @tool
-def visit_webpage(url: str) -> str:
-    """Visits a webpage at the given URL and returns its content as a markdown string.
+def visit_webpage(url: str, page: int | None = None) -> str:
+    """Visits a webpage at the given URL and returns one page of its content as a markdown string.
+
+    Long webpages are split into numbered pages; the output ends with the call that fetches the next one.
 
     Args:
         url: The URL of the webpage to visit.
+        page: The page of the content to return, starting at 1. Defaults to 1.
 
     Returns:
-        The content of the webpage converted to Markdown, or an error message if the request fails.
+        The requested page of the webpage converted to Markdown, or an error message if the request fails.
     """
     try:
-        # Send a GET request to the URL
-        response = requests.get(url)
-        response.raise_for_status()  # Raise an exception for bad status codes
+        pages, truncated = _webpage_pages(normalize_url(url), ttl_bucket(VISIT_WEBPAGE_CACHE_TTL))
+    except UnsupportedContentError as e:
+        return (
+            f"The URL does not point to an HTML page (Content-Type: {e}). "
+            "Download it and open it with the file tools instead."
+        )
+    except RequestException as e:
+        return f"Error fetching the webpage: {str(e)}"
+    except Exception as e:
+        return f"An unexpected error occurred: {str(e)}"
+
+    page = page or 1
+    if not 1 <= page <= len(pages):
+        return f"Page {page} does not exist, the webpage has {len(pages)} page(s)."
+    content = pages[page - 1]
+    if len(pages) == 1 and not truncated:
+        return content
+
+    footer = f"[Page {page} of {len(pages)}."
+    if page < len(pages):
+        footer += f' Call visit_webpage(url="{url}", page={page + 1}) for the next page.'
+    if truncated:
+        footer += f" The webpage was cut off after {VISIT_WEBPAGE_MAX_BYTES} bytes."
+    return f"{content}\n\n{footer}]"
+
 
-        # Convert the HTML content to Markdown
-        markdown_content = markdownify(response.text).strip()
+# Shared by all concurrent fetch_webpages calls, so parallel agents do not hammer one site together
+_host_semaphores: dict[str, threading.Semaphore] = {}
+_host_semaphores_lock = threading.Lock()
 
-        # Remove multiple line breaks
-        markdown_content = re.sub(r"\n{3,}", "\n\n", markdown_content)
 
-        return markdown_content
+def _host_semaphore(url: str) -> threading.Semaphore:
+    host = urlsplit(url).hostname or ""
+    with _host_semaphores_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.Semaphore(FETCH_WEBPAGES_PER_HOST)
+        return _host_semaphores[host]
 
+
+def _fetch_excerpt(url: str, max_chars: int, deadline: float) -> str:
+    """
+    Fetches one page for `fetch_webpages` and returns its excerpt.
+    """
+    semaphore = _host_semaphore(url)
+    if not semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+        return "Skipped: the deadline passed while waiting for other requests to this host."
+    try:
+        pages, _ = _webpage_pages(normalize_url(url), ttl_bucket(VISIT_WEBPAGE_CACHE_TTL))
+    except UnsupportedContentError as e:
+        return f"Not an HTML page (Content-Type: {e})."
     except RequestException as e:
         return f"Error fetching the webpage: {str(e)}"
     except Exception as e:
         return f"An unexpected error occurred: {str(e)}"
+    finally:
+        semaphore.release()
+
+    excerpt = pages[0][:max_chars]
+    if len(pages) > 1 or len(pages[0]) > max_chars:
+        excerpt += (
+            f"\n[... excerpt of {len(pages)} page(s), "
+            f'call visit_webpage(url="{url}", page=1) for the full text]'
+        )
+    return excerpt
+
+
+@tool
+def fetch_webpages(urls: list[str], max_chars: int | None = None) -> str:
+    """Fetches several webpages at once and returns the beginning of each as markdown.
+
+    Use it to skim a batch of search results in one step, then visit_webpage the relevant ones.
+
+    Args:
+        urls: The URLs of the webpages to fetch.
+        max_chars: The number of characters to return per webpage. Defaults to 1500.
+
+    Returns:
+        One markdown excerpt per URL, in the given order, each under a "## <url>" heading.
+    """
+    max_chars = max_chars or FETCH_WEBPAGES_EXCERPT_CHARS
+    urls = list(dict.fromkeys(urls))[:FETCH_WEBPAGES_MAX_URLS]
+    deadline = time.monotonic() + FETCH_WEBPAGES_DEADLINE
+
+    executor = ThreadPoolExecutor(max_workers=max(min(FETCH_WEBPAGES_MAX_WORKERS, len(urls)), 1))
+    try:
+        futures = [executor.submit(_fetch_excerpt, url, max_chars, deadline) for url in urls]
+        wait(futures, timeout=FETCH_WEBPAGES_DEADLINE)
+    finally:
+        # Requests still running finish in the background and land in the caches
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    sections = []
+    for url, future in zip(urls, futures):
+        if future.done() and not future.cancelled():
+            excerpt = future.result()
+        else:
+            excerpt = f"Timed out after {FETCH_WEBPAGES_DEADLINE:g}s."
+        sections.append(f"## {url}\n{excerpt}")
+    return "\n\n".join(sections)
@@ -0,0 +1,400 @@
+import itertools
+import os
+from typing import Iterable
+
+SPREADSHEET_MAX_ROWS: int = int(os.getenv("SPREADSHEET_MAX_ROWS", default=200))
+SPREADSHEET_SCHEMA_ROWS: int = int(os.getenv("SPREADSHEET_SCHEMA_ROWS", default=1000))
+
+
+def cell_text(value) -> str:
+    """
+    Formats a cell value, with empty cells as empty strings.
+    """
+    return str(value) if value is not None else ""
+
+
+def format_rows(rows: Iterable[Iterable]) -> str:
+    """
+    Joins rows into lines of comma-separated cells.
+    """
+    return "\n".join(", ".join(cell_text(cell) for cell in row) for row in rows)
+
+
+def summarize_columns(headers: list[str], rows: Iterable[tuple]) -> tuple[list[str], int]:
+    """
+    Describes each column from a stream of rows: types, fill rate, range and examples.
+
+    Args:
+        headers (list[str]): The column names.
+        rows (Iterable[tuple]): The data rows.
+    Returns:
+        tuple[list[str], int]: One line per column, and the number of rows read.
+    """
+    stats = [
+        {"types": set(), "filled": 0, "min": None, "max": None, "examples": []}
+        for _ in headers
+    ]
+    n_rows = 0
+    for row in rows:
+        n_rows += 1
+        for column, value in zip(stats, row):
+            if value is None or value == "":
+                continue
+            column["filled"] += 1
+            column["types"].add(type(value).__name__)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                column["min"] = value if column["min"] is None else min(column["min"], value)
+                column["max"] = value if column["max"] is None else max(column["max"], value)
+            if len(column["examples"]) < 3 and cell_text(value) not in column["examples"]:
+                column["examples"].append(cell_text(value))
+
+    lines = []
+    for header, column in zip(headers, stats):
+        line = (
+            f"{header}: {'/'.join(sorted(column['types'])) or 'empty'}, "
+            f"{column['filled']}/{n_rows} filled"
+        )
+        if column["min"] is not None:
+            line += f", min {column['min']}, max {column['max']}"
+        if column["examples"]:
+            line += f", e.g. {', '.join(column['examples'])}"
+        lines.append(line)
+    return lines, n_rows
+
+
+def _column_indices(columns: list[str], header: tuple) -> list[int]:
+    """
+    Resolves column letters ("C") or header names to zero-based column indices.
+    """
+    from openpyxl.utils import column_index_from_string
+
+    names = [cell_text(value).strip().casefold() for value in header]
+    indices = []
+    for column in columns:
+        key = column.strip().casefold()
+        if key in names:
+            indices.append(names.index(key))
+            continue
+        try:
+            indices.append(column_index_from_string(column.strip().upper()) - 1)
+        except ValueError:
+            raise ValueError(
+                f"Unknown column '{column}', use a letter or one of {[cell_text(v) for v in header]}"
+            )
+    return indices
+
+
+def read_xlsx(
+    file_name: str,
+    sheet: str | None = None,
+    start_row: int | None = None,
+    end_row: int | None = None,
+    columns: list[str] | None = None,
+    mode: str | None = None,
+) -> str:
+    """
+    Reads a workbook in openpyxl's read-only streaming mode.
+
+    Only the requested rows are pulled from the file, so memory and time are
+    bounded by the window rather than the workbook size.
+
+    Args:
+        file_name (str): The path of the workbook.
+        sheet (str | None): The sheet to read. Defaults to the active sheet.
+        start_row (int | None): The first row to return, counting from 1 like Excel.
+        end_row (int | None): The last row to return. Defaults to `SPREADSHEET_MAX_ROWS` rows.
+        columns (list[str] | None): Column letters or header names to return. Defaults to all.
+        mode (str | None): "rows" (default) for the cell values, "sheets" to list the sheets
+            with their dimensions, or "schema" to describe each column of the sheet.
+    Returns:
+        str: The requested view of the workbook.
+    """
+    import openpyxl
+
+    wb = openpyxl.load_workbook(file_name, read_only=True, data_only=True)
+    try:
+        if mode == "sheets":
+            return "\n".join(
+                f"{ws.title}: {ws.max_row or '?'} rows x {ws.max_column or '?'} columns"
+                + (" (active)" if ws.title == wb.active.title else "")
+                for ws in wb.worksheets
+            )
+
+        if sheet is not None and sheet not in wb.sheetnames:
+            return f"Sheet '{sheet}' not found. Sheets: {', '.join(wb.sheetnames)}"
+        ws = wb[sheet] if sheet is not None else wb.active
+
+        header = next(ws.iter_rows(min_row=1, max_row=1, values_only=True), ())
+        indices = _column_indices(columns, header) if columns else None
+
+        def select(row: tuple) -> tuple:
+            if indices is None:
+                return row
+            return tuple(row[i] if i < len(row) else None for i in indices)
+
+        if mode == "schema":
+            headers = [
+                cell_text(value) or f"Column {i + 1}" for i, value in enumerate(select(header))
+            ]
+            rows = ws.iter_rows(min_row=2, max_row=SPREADSHEET_SCHEMA_ROWS + 1, values_only=True)
+            lines, scanned = summarize_columns(headers, (select(row) for row in rows))
+            return (
+                f"Sheet '{ws.title}': {ws.max_row or '?'} rows x {ws.max_column or '?'} columns, "
+                f"schema from the first {scanned} data rows\n" + "\n".join(lines)
+            )
+
+        if mode not in (None, "rows"):
+            return f"Unsupported mode '{mode}'. Supported modes are 'rows', 'sheets' and 'schema'."
+
+        start_row = max(start_row or 1, 1)
+        if end_row and end_row < start_row:
+            return f"Invalid row range: start_row {start_row} is after end_row {end_row}."
+        last_row = start_row + SPREADSHEET_MAX_ROWS - 1
+        end_row = min(end_row, last_row) if end_row else last_row
+        # Without a known sheet size, one row past the window tells whether there is more
+        lookahead = 0 if ws.max_row else 1
+        rows = [
+            select(row)
+            for row in ws.iter_rows(
+                min_row=start_row, max_row=end_row + lookahead, values_only=True
+            )
+        ]
+        if ws.max_row:
+            more = end_row < ws.max_row
+        else:
+            more = len(rows) > end_row - start_row + 1 and any(
+                cell is not None for cell in rows[-1]
+            )
+        rows = rows[: end_row - start_row + 1]
+        content = format_rows(rows)
+        if more:
+            total = f" of {ws.max_row}" if ws.max_row else ""
+            content += (
+                f"\n[Rows {start_row}-{end_row}{total} of sheet '{ws.title}', more rows follow: "
+                f"pass start_row/end_row to read them]"
+            )
+        return content
+    finally:
+        wb.close()
+
+
+CSV_CHUNK_ROWS: int = int(os.getenv("CSV_CHUNK_ROWS", default=50_000))
+CSV_PREVIEW_ROWS: int = int(os.getenv("CSV_PREVIEW_ROWS", default=20))
+# Distinct values counted per column in describe mode before the rarest are dropped
+CSV_TRACKED_VALUES: int = int(os.getenv("CSV_TRACKED_VALUES", default=10_000))
+
+
+def _sniff_delimiter(file_name: str) -> str:
+    """
+    Guesses the delimiter of a delimited text file from its first 64KB.
+    """
+    import csv
+
+    with open(file_name, "r", encoding="utf-8", errors="replace", newline="") as f:
+        sample = f.read(64 * 1024)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+
+def _csv_chunks(file_name: str, delimiter: str, columns: list[str] | None, raw: bool):
+    """
+    Streams a CSV file as DataFrames of `CSV_CHUNK_ROWS` rows.
+
+    The chunks are indexed by their zero-based data row number. With `raw`,
+    cells are kept as the strings found in the file.
+    """
+    import pandas as pd
+
+    kwargs = {"dtype": str, "keep_default_na": False} if raw else {}
+    header = pd.read_csv(
+        file_name, sep=delimiter, nrows=0, encoding="utf-8", encoding_errors="replace"
+    ).columns
+    if columns:
+        names = [header[i] for i in _column_indices(columns, tuple(header)) if i < len(header)]
+        kwargs["usecols"] = names
+    else:
+        names = list(header)
+    with pd.read_csv(
+        file_name,
+        sep=delimiter,
+        chunksize=CSV_CHUNK_ROWS,
+        encoding="utf-8",
+        encoding_errors="replace",
+        **kwargs,
+    ) as reader:
+        for chunk in reader:
+            # usecols keeps the file's column order, the caller's order is restored here
+            yield chunk[names]
+
+
+def _describe_csv(chunks, names: list[str]) -> tuple[list[str], int]:
+    """
+    Describes each column over every chunk: type, null count, range and top values.
+
+    Each chunk is reduced with vectorized pandas operations, so only per-column
+    aggregates are held while the file streams through.
+    """
+    import pandas as pd
+
+    nulls = pd.Series(0, index=names)
+    numeric = pd.Series(0, index=names)
+    minimum: dict[str, object] = {}
+    maximum: dict[str, object] = {}
+    kinds: dict[str, set[str]] = {name: set() for name in names}
+    counts: dict[str, pd.Series] = {name: pd.Series(dtype="int64") for name in names}
+    truncated: set[str] = set()
+    n_rows = 0
+    for chunk in chunks:
+        n_rows += len(chunk)
+        nulls += chunk.isna().sum()
+        for name in names:
+            column = chunk[name]
+            kinds[name].add(column.dtype.kind)
+            values = pd.to_numeric(column, errors="coerce").dropna()
+            numeric[name] += len(values)
+            # True/False parse as 1/0, a range of them says nothing
+            if len(values) and column.dtype.kind != "b":
+                low, high = values.min(), values.max()
+                minimum[name] = low if name not in minimum else min(minimum[name], low)
+                maximum[name] = high if name not in maximum else max(maximum[name], high)
+            merged = counts[name].add(column.value_counts(), fill_value=0)
+            if len(merged) > CSV_TRACKED_VALUES:
+                merged = merged.nlargest(CSV_TRACKED_VALUES)
+                truncated.add(name)
+            counts[name] = merged
+
+    lines = []
+    for name in names:
+        filled = n_rows - int(nulls[name])
+        if filled == 0:
+            kind = "empty"
+        elif kinds[name] <= {"i", "u"}:
+            kind = "integer"
+        elif kinds[name] <= {"i", "u", "f"}:
+            kind = "float"
+        elif kinds[name] == {"b"}:
+            kind = "boolean"
+        elif numeric[name] == filled:
+            kind = "number"
+        elif numeric[name]:
+            kind = f"text ({int(numeric[name])} numeric)"
+        else:
+            kind = "text"
+        line = f"{name}: {kind}, {int(nulls[name])}/{n_rows} null"
+        if name in minimum:
+            line += f", min {minimum[name]}, max {maximum[name]}"
+        distinct = counts[name]
+        if len(distinct):
+            approximate = "over " if name in truncated else ""
+            top = ", ".join(
+                f"{cell_text(value)} ({int(count)})" for value, count in distinct.nlargest(3).items()
+            )
+            line += f", {approximate}{len(distinct)} distinct"
+            if distinct.max() > 1:
+                line += f", top {top}"
+        lines.append(line)
+    return lines, n_rows
+
+
+def read_csv(
+    file_name: str,
+    start_row: int | None = None,
+    end_row: int | None = None,
+    columns: list[str] | None = None,
+    mode: str | None = None,
+) -> str:
+    """
+    Reads a CSV file in chunks of `CSV_CHUNK_ROWS` rows.
+
+    The file is never loaded whole: windows stop reading once they are
+    filled, and tail, sample and describe keep only their result while the
+    chunks stream through.
+
+    Args:
+        file_name (str): The path of the CSV file.
+        start_row (int | None): The first data row to return, counting from 1 after the header.
+        end_row (int | None): The last data row to return. Defaults to `SPREADSHEET_MAX_ROWS` rows.
+        columns (list[str] | None): Header names or column letters to return. Defaults to all.
+        mode (str | None): "rows" (default) for a window of rows, "head", "tail" or "sample"
+            for `CSV_PREVIEW_ROWS` rows from the start, the end or at random, or "describe"
+            to summarize every column over the whole file.
+    Returns:
+        str: The requested view of the file.
+    """
+    import numpy as np
+    import pandas as pd
+
+    mode = mode or "rows"
+    if mode not in ("rows", "head", "tail", "sample", "describe"):
+        return (
+            f"Unsupported mode '{mode}'. Supported modes are "
+            f"'rows', 'head', 'tail', 'sample' and 'describe'."
+        )
+    delimiter = _sniff_delimiter(file_name)
+    # A file without even a header row fails on the header read of every mode
+    try:
+        if mode == "describe":
+            chunks = _csv_chunks(file_name, delimiter, columns, raw=False)
+            first = next(chunks, None)
+            if first is None:
+                return "The file is empty."
+            names = list(first.columns)
+            lines, n_rows = _describe_csv(itertools.chain([first], chunks), names)
+            return f"{n_rows} data rows x {len(names)} columns\n" + "\n".join(lines)
+
+        chunks = _csv_chunks(file_name, delimiter, columns, raw=True)
+        if mode in ("rows", "head"):
+            start_row = max(start_row or 1, 1) if mode == "rows" else 1
+            if mode == "rows" and end_row and end_row < start_row:
+                return f"Invalid row range: start_row {start_row} is after end_row {end_row}."
+            limit = SPREADSHEET_MAX_ROWS if mode == "rows" else CSV_PREVIEW_ROWS
+            last_row = start_row + limit - 1
+            end_row = min(end_row, last_row) if end_row and mode == "rows" else last_row
+            parts, header, read = [], None, 0
+            for chunk in chunks:
+                header = chunk.columns
+                # One row past the window tells whether there is more
+                parts.append(chunk.iloc[max(start_row - 1 - read, 0) : max(end_row + 1 - read, 0)])
+                read += len(chunk)
+                if read > end_row:
+                    break
+            window = pd.concat(parts) if parts else pd.DataFrame(columns=header)
+            more = len(window) > end_row - start_row + 1
+            window = window.iloc[: end_row - start_row + 1]
+            content = format_rows([tuple(window.columns), *window.itertuples(index=False)])
+            if more:
+                content += (
+                    f"\n[Data rows {start_row}-{end_row}, more rows follow: "
+                    f"pass start_row/end_row or mode 'tail'/'describe' to read them]"
+                )
+            return content
+
+        rng = np.random.default_rng(0)
+        kept, keys, n_rows = None, None, 0
+        for chunk in chunks:
+            n_rows += len(chunk)
+            if mode == "tail":
+                kept = chunk if kept is None else pd.concat([kept, chunk])
+                kept = kept.tail(CSV_PREVIEW_ROWS)
+                continue
+            # Reservoir sampling: every row draws a key and the smallest keys are kept
+            chunk_keys = pd.Series(rng.random(len(chunk)), index=chunk.index)
+            keys = chunk_keys if keys is None else pd.concat([keys, chunk_keys])
+            keys = keys.nsmallest(CSV_PREVIEW_ROWS)
+            kept = chunk if kept is None else pd.concat([kept, chunk])
+            kept = kept.loc[keys.index]
+        if kept is None:
+            return "The file is empty."
+        kept = kept.sort_index()
+        rows = [
+            (index + 1, *row) for index, row in zip(kept.index, kept.itertuples(index=False))
+        ]
+        described = "Last" if mode == "tail" else "Random sample of"
+        return (
+            f"[{described} {len(kept)} of {n_rows} data rows, numbered in the first column]\n"
+            + format_rows([("row", *kept.columns), *rows])
+        )
+    except pd.errors.EmptyDataError:
+        return "The file is empty."
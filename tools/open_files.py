@@ -1,10 +1,8 @@
 from smolagents import Tool
-import os
 import json
-import csv
-import openpyxl
-import whisper
-import requests
+from tools.file_readers import read_csv, read_xlsx
+from utils.attachments import resolve_attachment
+from utils.transcription import get_transcriber
 
 
 class OpenFilesTool(Tool):
@@ -23,30 +21,71 @@ class OpenFilesTool(Tool):
             "description": "The type of the file (text, csv, json, xlsx, mp3). Default is 'text'.",
             "nullable": True,
         },
+        "sheet": {
+            "type": "string",
+            "description": "xlsx only: the sheet to read. Defaults to the active sheet.",
+            "nullable": True,
+        },
+        "start_row": {
+            "type": "integer",
+            "description": "csv and xlsx: the first row to return, counting from 1 like Excel for xlsx "
+            "and from the first data row for csv.",
+            "nullable": True,
+        },
+        "end_row": {
+            "type": "integer",
+            "description": "csv and xlsx: the last row to return. At most 200 rows are returned per call.",
+            "nullable": True,
+        },
+        "columns": {
+            "type": "array",
+            "description": "csv and xlsx: column letters or header names to return. Defaults to all.",
+            "nullable": True,
+        },
+        "mode": {
+            "type": "string",
+            "description": "xlsx: 'rows' (default) for cell values, 'sheets' to list the sheets "
+            "with their sizes, or 'schema' for each column's type, fill rate, range and examples. "
+            "csv: 'rows' (default) for a window of rows, 'head', 'tail' or 'sample' for 20 rows "
+            "from the start, the end or at random, or 'describe' for each column's type, null "
+            "count, range and top values over the whole file.",
+            "nullable": True,
+        },
     }
     output_type = "string"
 
 
-    def download_file(self, file_name: str) -> None:
-        if not os.path.exists(file_name):
-            url = f"https://agents-course-unit4-scoring.hf.space/files/{file_name.split('.')[0]}"
-            r = requests.get(url)
-            with open(file_name, "wb") as f:
-                f.write(r.content)
+    def download_file(self, file_name: str) -> str:
+        # Attachments are usually prefetched, see `utils.attachments.prefetch_attachments`
+        return resolve_attachment(file_name)
 
 
-    def open_file_as_text(self, file_name: str, filetype: str = "txt") -> str:
+    def open_file_as_text(
+        self,
+        file_name: str,
+        filetype: str = "txt",
+        sheet: str | None = None,
+        start_row: int | None = None,
+        end_row: int | None = None,
+        columns: list[str] | None = None,
+        mode: str | None = None,
+    ) -> str:
         """
         Opens a file and returns its content as readable text.
         Supports 'txt', 'json', 'csv', 'xlsx', and 'mp3' (transcribes speech to text).
         Args:
             file_name (str): The path or name of the file.
             filetype (Optional[str]): Type of file ('txt', 'json', 'csv', 'xlsx', 'mp3'). Defaults to 'txt'.
+            sheet (str | None): The xlsx sheet to read.
+            start_row (int | None): The first csv or xlsx row to return.
+            end_row (int | None): The last csv or xlsx row to return.
+            columns (list[str] | None): The csv or xlsx columns to return.
+            mode (str | None): The csv or xlsx view, see `tools.file_readers`.
         Returns:
             str: The content of the file as text, or transcribed speech if 'mp3'.
         """
-        self.download_file(file_name)
         try:
+            file_name = self.download_file(file_name)
             if filetype == "txt":
                 with open(file_name, "r", encoding="utf-8") as f:
                     return f.read()
@@ -57,23 +96,14 @@ class OpenFilesTool(Tool):
                 return json.dumps(data, indent=2)
 
             elif filetype == "csv":
-                with open(file_name, "r", encoding="utf-8") as f:
-                    reader = csv.reader(f)
-                    rows = list(reader)
-                return "\n".join([", ".join(row) for row in rows])
+                return read_csv(file_name, start_row, end_row, columns, mode)
 
             elif filetype == "xlsx":
-                wb = openpyxl.load_workbook(file_name, data_only=True)
-                sheet = wb.active
-                content = []
-                for row in sheet.iter_rows(values_only=True):
-                    content.append(", ".join(str(cell) if cell is not None else "" for cell in row))
-                return "\n".join(content)
+                return read_xlsx(file_name, sheet, start_row, end_row, columns, mode)
 
             elif filetype == "mp3":
-                w = whisper.load_model("base")
-                res = w.transcribe(file_name)
-                return res["text"]
+                # Transcripts are cached by content hash, long files are transcribed in parallel chunks
+                return get_transcriber().transcribe(file_name)
 
             else:
                 return f"Unsupported filetype '{filetype}'. Supported types are 'txt', 'json', 'csv', 'xlsx', and 'mp3'."
@@ -83,13 +113,30 @@ class OpenFilesTool(Tool):
         except Exception as e:
             return f"Error opening file '{file_name}': {str(e)}"
 
-    def forward(self, file_path: str, file_type: str = "text") -> str:
+    def forward(
+        self,
+        file_path: str,
+        file_type: str = "text",
+        sheet: str | None = None,
+        start_row: int | None = None,
+        end_row: int | None = None,
+        columns: list[str] | None = None,
+        mode: str | None = None,
+    ) -> str:
         """
         Opens a file and returns its content as a string.
         Args:
             file_path (str): The path to the file to be opened.
             file_type (str): The type of the file (text, csv, json, xlsx, mp3). Default is 'text'.
+            sheet (str | None): The xlsx sheet to read.
+            start_row (int | None): The first csv or xlsx row to return.
+            end_row (int | None): The last csv or xlsx row to return.
+            columns (list[str] | None): The csv or xlsx columns to return.
+            mode (str | None): The xlsx view ('rows', 'sheets' or 'schema') or the csv view
+                ('rows', 'head', 'tail', 'sample' or 'describe').
         Returns:
             str: The content of the file as a string.
         """
-        return self.open_file_as_text(file_path, file_type)
+        return self.open_file_as_text(
+            file_path, file_type, sheet, start_row, end_row, columns, mode
+        )
@@ -1,57 +1,363 @@
-from smolagents import Tool
-import requests
-from bs4 import BeautifulSoup, Tag
+import os
+import re
+from functools import lru_cache
+from urllib.parse import quote
+from smolagents import Tool, WikipediaSearchTool
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from utils.html_parsing import resolve_parser_backend
+from utils.http_cache import cached_get, normalize_url, ttl_bucket
+from utils.wikipedia_snapshot import (
+    WIKIPEDIA_OFFLINE,
+    ArticleNotInSnapshotError,
+    get_wikipedia_snapshot,
+)
+
+# "auto" picks lxml when it is installed and falls back to the pure-Python "html.parser"
+WIKIPEDIA_PARSER_BACKEND: str = os.getenv("WIKIPEDIA_PARSER_BACKEND", default="auto")
+WIKIPEDIA_CACHE_SIZE: int = int(os.getenv("WIKIPEDIA_CACHE_SIZE", default=32))
+# Parsed articles are not revalidated against the HTTP cache, so they are only reused this long
+WIKIPEDIA_CACHE_TTL: float = float(os.getenv("WIKIPEDIA_CACHE_TTL", default=86400))
+
+H_TAGS: list[str] = [f"h{i}" for i in range(1, 6)]
+EXTRA_TAGS: list[str] = ["p", "ul", "ol"]
+# Guards against malformed spans such as rowspan="10000"
+MAX_TABLE_SPAN: int = 1000
+
+
+class WikipediaSection:
+    """
+    A heading of an article with its text and its subsections.
+    """
+
+    def __init__(self, title: str, level: int):
+        self.title = title
+        self.level = level
+        self.elements: list[str] = []
+        self.children: list["WikipediaSection"] = []
+
+    def render(self) -> list[str]:
+        """
+        Returns the text elements of the section and its subsections, in page order.
+        """
+        elements = ["\n\n" + self.title + "\n"] if self.title else []
+        elements.extend(self.elements)
+        for child in self.children:
+            elements.extend(child.render())
+        return elements
+
+    def find(self, title: str) -> "WikipediaSection | None":
+        """
+        Finds a section by its title, case-insensitively.
+        """
+        if self.title.casefold() == title.strip().casefold():
+            return self
+        for child in self.children:
+            section = child.find(title)
+            if section is not None:
+                return section
+        return None
+
+    def titles(self) -> list[str]:
+        """
+        Returns the titles of all subsections, indented by depth.
+        """
+        titles = []
+        for child in self.children:
+            titles.append("  " * (child.level - 2) + child.title)
+            titles.extend(child.titles())
+        return titles
+
+
+def clean_cell(cell: Tag) -> str:
+    """
+    Returns the text of a table cell without reference marks and hidden sort keys.
+    """
+    for hidden in cell.find_all(["sup", "span"], class_=["reference", "sortkey"]):
+        hidden.decompose()
+    return cell.get_text(separator=" ", strip=True)
+
+
+def _span(cell: Tag, attribute: str) -> int:
+    digits = re.match(r"\d+", cell.get(attribute, "1").strip())
+    return min(max(int(digits.group()), 1), MAX_TABLE_SPAN) if digits else 1
+
+
+def parse_table_grid(table: Tag) -> tuple[list[list[str]], int]:
+    """
+    Expands a table into a rectangular grid, repeating cells across their rowspan and colspan.
+
+    Args:
+        table (Tag): BeautifulSoup Tag for the table.
+    Returns:
+        tuple[list[list[str]], int]: The grid rows and the number of leading header rows.
+    """
+    grid: list[list[str]] = []
+    header_rows = 0
+    # Column index -> (rows still covered, text) of cells spanning down from earlier rows
+    spanning: dict[int, tuple[int, str]] = {}
+    for tr in table.find_all("tr"):
+        if tr.find_parent("table") is not table:
+            continue  # a row of a nested table
+        cells = tr.find_all(["th", "td"], recursive=False)
+        row: list[str] = []
+
+        def fill_spanning() -> None:
+            while len(row) in spanning:
+                remaining, text = spanning.pop(len(row))
+                if remaining > 1:
+                    spanning[len(row)] = (remaining - 1, text)
+                row.append(text)
+
+        for cell in cells:
+            fill_spanning()
+            text = clean_cell(cell)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                if rowspan > 1:
+                    spanning[len(row)] = (rowspan - 1, text)
+                row.append(text)
+        fill_spanning()
+        # Spans reaching past the end of the row still cover it
+        for col in sorted(c for c in spanning if c >= len(row)):
+            while len(row) < col:
+                row.append("")
+            fill_spanning()
+
+        if not row:
+            continue
+        if header_rows == len(grid) and all(cell.name == "th" for cell in cells):
+            header_rows += 1
+        grid.append(row)
+    return grid, header_rows
+
+
+class WikipediaTable:
+    """
+    A wikitable stored column by column.
+    """
+
+    def __init__(self, index: int, caption: str, section: str, table: Tag):
+        """
+        Args:
+            index (int): The position of the table on the page.
+            caption (str): The table caption.
+            section (str): The heading the table sits under.
+            table (Tag): BeautifulSoup Tag for the table.
+        """
+        self.index = index
+        self.caption = caption
+        self.section = section
+        grid, header_rows = parse_table_grid(table)
+        width = max((len(row) for row in grid), default=0)
+        names = []
+        for col in range(width):
+            parts = []
+            for row in grid[:header_rows]:
+                if col < len(row) and row[col] and row[col] not in parts:
+                    parts.append(row[col])
+            name = " / ".join(parts) or f"Column {col + 1}"
+            if name in names:
+                name = f"{name} ({names.count(name) + 1})"
+            names.append(name)
+        headers = grid[:header_rows]
+        body = [row for row in grid[header_rows:] if row not in headers]
+        self.columns: dict[str, list[str]] = {
+            name: [row[col] if col < len(row) else "" for row in body]
+            for col, name in enumerate(names)
+        }
+        self.n_rows = len(body)
+
+    def summary(self) -> dict:
+        """
+        Describes the table without its rows.
+        """
+        return {
+            "table": self.index,
+            "caption": self.caption,
+            "section": self.section,
+            "columns": list(self.columns),
+            "n_rows": self.n_rows,
+        }
+
+    def select(
+        self,
+        columns: list[str] | None = None,
+        start_row: int | None = None,
+        end_row: int | None = None,
+    ) -> dict[str, list[str]]:
+        """
+        Returns a slice of the table as a column name -> values mapping.
+
+        Args:
+            columns (list[str] | None): The columns to keep, matched case-insensitively.
+                Defaults to all columns.
+            start_row (int | None): The first row to keep, counting from 0.
+            end_row (int | None): The row to stop before.
+        Returns:
+            dict[str, list[str]]: The selected values by column.
+        """
+        names = list(self.columns)
+        if columns:
+            by_key = {name.casefold(): name for name in names}
+            missing = [col for col in columns if col.strip().casefold() not in by_key]
+            if missing:
+                raise ValueError(f"Unknown columns {missing}, the table has {names}")
+            names = [by_key[col.strip().casefold()] for col in columns]
+        rows = slice(start_row, end_row)
+        return {name: self.columns[name][rows] for name in names}
+
+
+class WikipediaArticle:
+    """
+    The parsed content of an article: its section tree and its wikitables.
+    """
+
+    def __init__(self, sections: WikipediaSection, tables: list[WikipediaTable]):
+        self.sections = sections
+        self.tables = tables
+
+
+def build_article(content_div: Tag) -> WikipediaArticle:
+    """
+    Builds the section tree and the tables of an article in a single pass over its content.
+
+    Each wikitable is left in the section text as a one-line pointer to the table tool.
+
+    Args:
+        content_div (Tag): The `mw-content-text` element of the article.
+    Returns:
+        WikipediaArticle: The article, whose untitled root section holds the lead.
+    """
+    root = WikipediaSection("", level=0)
+    stack = [root]
+    tables: list[WikipediaTable] = []
+    for elem in content_div.find_all(H_TAGS + EXTRA_TAGS + ["table"]):
+        if elem.name in H_TAGS:
+            level = int(elem.name[1])
+            while stack[-1].level >= level:
+                stack.pop()
+            title = elem.get_text(strip=True).removesuffix("[edit]")
+            section = WikipediaSection(title, level)
+            stack[-1].children.append(section)
+            stack.append(section)
+        elif elem.name == "table":
+            if "wikitable" not in elem.get("class", []):
+                continue
+            caption = elem.caption.get_text(strip=True) if elem.caption else ""
+            table = WikipediaTable(len(tables), caption, stack[-1].title, elem)
+            tables.append(table)
+            stack[-1].elements.append(
+                f"[Table {table.index}: {caption or ', '.join(table.columns)} "
+                f"({table.n_rows} rows), query it with wikipedia_table_tool]"
+            )
+        else:
+            stack[-1].elements.append(elem.get_text(strip=True))
+    return WikipediaArticle(root, tables)
+
+
+def fetch_article_html(url: str) -> str:
+    """
+    Returns the HTML of a page, from the local Wikipedia snapshot when it holds it.
+
+    Args:
+        url (str): The URL of the page.
+    Returns:
+        str: The page HTML.
+    Raises:
+        ArticleNotInSnapshotError: If `WIKIPEDIA_OFFLINE` is set and the snapshot lacks the page.
+    """
+    snapshot = get_wikipedia_snapshot()
+    if snapshot is not None:
+        page = snapshot.get_url(url)
+        if page is not None:
+            return page[1]
+        if WIKIPEDIA_OFFLINE:
+            raise ArticleNotInSnapshotError(f"{url} is not in the offline Wikipedia snapshot")
+    resp = cached_get(url)
+    resp.raise_for_status()
+    return resp.text
+
+
+@lru_cache(maxsize=WIKIPEDIA_CACHE_SIZE)
+def parse_article(url: str, backend: str, ttl_window: int = 0) -> WikipediaArticle | None:
+    """
+    Fetches and parses an article into its section tree and tables, once per URL and TTL window.
+
+    Only the `mw-content-text` element is built into a tree, the navigation
+    and other page chrome are skipped by the parser.
+
+    Args:
+        url (str): The normalized URL of the article.
+        backend (str): The BeautifulSoup tree builder.
+        ttl_window (int): The `ttl_bucket` window, so an article is parsed again once it ends.
+    Returns:
+        WikipediaArticle | None: The article, or None if the page has no article content.
+    """
+    soup = BeautifulSoup(
+        fetch_article_html(url),
+        backend, parse_only=SoupStrainer("div", id="mw-content-text")
+    )
+    content_div = soup.find("div", id="mw-content-text")
+    if not content_div:
+        return None
+    return build_article(content_div)
 
 
 class WikipediaParser(Tool):
     name: str = "wikipedia_parser_tool"
     description: str = (
-        "This tool parse a Wikipedia page into a clean, readable text format."
+        "This tool parse a Wikipedia page into a clean, readable text format. "
+        "Headings are shown without their '[edit]' links, and each table is replaced "
+        "by a one-line pointer to query it with wikipedia_table_tool."
     )
     inputs: dict[str, dict[str, str]] = {
         "url": {
             "type": "string",
             "description": "The Wikipedia page url.",
-        }
+        },
+        "section": {
+            "type": "string",
+            "description": "The heading of the section to return, e.g. 'Discography'. "
+            "Omit it to get the whole page; an unknown heading lists the available ones.",
+            "nullable": True,
+        },
     }
     output_type: str = "string"
 
-    def get_wikipedia_page(self, url: str) -> str:
+    def __init__(self, backend: str = WIKIPEDIA_PARSER_BACKEND, *args, **kwargs):
+        """
+        Args:
+            backend (str): The BeautifulSoup tree builder, see `resolve_parser_backend`.
+        """
+        super().__init__(*args, **kwargs)
+        self.backend = resolve_parser_backend(backend)
+
+    def get_wikipedia_page(self, url: str, section: str | None = None) -> str:
         """
         Fetches the content of a Wikipedia page given its URL.
         Args:
             url (str): The URL of the Wikipedia page.
+            section (str | None): The heading whose content to return. Defaults to the whole page.
         Returns:
-            str: The HTML content of the page.
+            str: The text content of the page or section.
         """
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=30)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "html.parser")
-
-        content_div = soup.find("div", id="mw-content-text")
-        if not content_div:
+        article = parse_article(normalize_url(url), self.backend, ttl_bucket(WIKIPEDIA_CACHE_TTL))
+        if article is None:
             return "Content not found."
 
-        elements: list[str] = []
-        h_tags: list[str] = [f"h{i}" for i in range(1, 6)]
-        extra_tags: list[str] = ["p", "ul", "ol"]
-        html_tags: list[str] = h_tags + extra_tags
+        sections = article.sections
+        if section:
+            found = sections.find(section)
+            if found is None:
+                return f"Section '{section}' not found. Available sections:\n" + "\n".join(
+                    sections.titles()
+                )
+            sections = found
 
-        for elem in content_div.find_all(html_tags):
-            if elem.name in h_tags:
-                elements.append("\n\n" + elem.get_text(strip=True) + "\n")
-            elif elem.name in extra_tags:
-                elements.append(elem.get_text(strip=True))
-            elif elem.name == "table":
-                elements.append(self.parse_wikipedia_table(elem))
+        return "\n\n".join(sections.render())
 
-        return "\n\n".join(elements)
-
-    def parse_wikipedia_table(table: Tag) -> str:
+    def parse_wikipedia_table(self, table: Tag) -> str:
         """
         Parses a Wikipedia table into a clean, readable text format.
         Args:
@@ -59,47 +365,130 @@ class WikipediaParser(Tool):
         Returns:
             str: Formatted table as readable text.
         """
-        rows = []
-        headers = []
-
-        # Try to get headers
-        thead = table.find("thead")
-        if thead:
-            for th in thead.find_all("th"):
-                header_text = th.get_text(separator=" ", strip=True)
-                headers.append(header_text)
-            if headers:
-                rows.append(" | ".join(headers))
-
-        # Parse table body rows
-        tbody = table.find("tbody")
-        if not tbody:
-            tbody = table  # fallback: some tables have no tbody explicitly
+        grid, _ = parse_table_grid(table)
+        return "\n".join(" | ".join(row) for row in grid)
 
-        for tr in tbody.find_all("tr"):
-            cells = tr.find_all(["th", "td"])
-            cell_texts = []
-            for cell in cells:
-                # Clean references like [7], [note 1], etc.
-                for sup in cell.find_all("sup", class_="reference"):
-                    sup.decompose()
+    def forward(self, url: str, section: str | None = None) -> str:
+        """
+        Parses the Wikipedia page and returns the content as a string.
+        Args:
+            url (str): The URL of the Wikipedia page.
+            section (str | None): The heading whose content to return.
+        Returns:
+            str: The parsed content of the page.
+        """
+        html_string = self.get_wikipedia_page(url, section)
+        return html_string
 
-                text = cell.get_text(separator=" ", strip=True)
-                cell_texts.append(text)
 
-            if cell_texts:
-                row_text = " | ".join(cell_texts)
-                rows.append(row_text)
+class WikipediaTableParser(Tool):
+    name: str = "wikipedia_table_tool"
+    description: str = (
+        "This tool extracts the tables of a Wikipedia page as columns of values. "
+        "Without a table index it lists the page's tables with their captions, sections, "
+        "columns and row counts; with one it returns a dict mapping each column name to "
+        "its values, optionally narrowed to some columns and a row range."
+    )
+    inputs: dict[str, dict[str, str]] = {
+        "url": {
+            "type": "string",
+            "description": "The Wikipedia page url.",
+        },
+        "table": {
+            "type": "integer",
+            "description": "The index of the table to return, as listed without it.",
+            "nullable": True,
+        },
+        "columns": {
+            "type": "array",
+            "description": "The names of the columns to return. Defaults to all columns.",
+            "nullable": True,
+        },
+        "start_row": {
+            "type": "integer",
+            "description": "The first row to return, counting from 0.",
+            "nullable": True,
+        },
+        "end_row": {
+            "type": "integer",
+            "description": "The row to stop before, as in a Python slice.",
+            "nullable": True,
+        },
+    }
+    output_type: str = "object"
 
-        return "\n".join(rows)
+    def __init__(self, backend: str = WIKIPEDIA_PARSER_BACKEND, *args, **kwargs):
+        """
+        Args:
+            backend (str): The BeautifulSoup tree builder, see `resolve_parser_backend`.
+        """
+        super().__init__(*args, **kwargs)
+        self.backend = resolve_parser_backend(backend)
 
-    def forward(self, url: str) -> str:
+    def forward(
+        self,
+        url: str,
+        table: int | None = None,
+        columns: list[str] | None = None,
+        start_row: int | None = None,
+        end_row: int | None = None,
+    ) -> dict:
         """
-        Parses the Wikipedia page and returns the content as a string.
+        Lists the tables of a Wikipedia page, or returns a slice of one of them.
         Args:
             url (str): The URL of the Wikipedia page.
+            table (int | None): The index of the table to return.
+            columns (list[str] | None): The columns to return.
+            start_row (int | None): The first row to return.
+            end_row (int | None): The row to stop before.
         Returns:
-            str: The parsed content of the page.
+            dict: The table summaries, or the selected values by column.
         """
-        html_string = self.get_wikipedia_page(url)
-        return html_string
+        article = parse_article(normalize_url(url), self.backend, ttl_bucket(WIKIPEDIA_CACHE_TTL))
+        tables = article.tables if article is not None else []
+        if table is None:
+            return {"tables": [t.summary() for t in tables]}
+        if not 0 <= table < len(tables):
+            raise ValueError(f"Table {table} does not exist, the page has {len(tables)} table(s).")
+        return tables[table].select(columns, start_row, end_row)
+
+
+class SnapshotWikipediaSearchTool(WikipediaSearchTool):
+    """
+    `WikipediaSearchTool` reading pages from the local Wikipedia snapshot when it holds them.
+
+    Queries are looked up as titles, redirects included. Pages missing from the
+    snapshot are searched live, unless `WIKIPEDIA_OFFLINE` is set.
+    """
+
+    def __init__(self, *args, backend: str = WIKIPEDIA_PARSER_BACKEND, **kwargs):
+        """
+        Args:
+            *args: Positional arguments passed to `WikipediaSearchTool`.
+            backend (str): The BeautifulSoup tree builder, see `resolve_parser_backend`.
+            **kwargs: Keyword arguments passed to `WikipediaSearchTool`.
+        """
+        super().__init__(*args, **kwargs)
+        self.backend = resolve_parser_backend(backend)
+
+    def forward(self, query: str) -> str:
+        snapshot = get_wikipedia_snapshot()
+        page = snapshot.get(query) if snapshot is not None else None
+        if page is None:
+            if snapshot is not None and WIKIPEDIA_OFFLINE:
+                return f"No Wikipedia page found for '{query}' in the offline snapshot. Try a different query."
+            return super().forward(query)
+
+        title = page[0]
+        url = f"https://{snapshot.language}.wikipedia.org/wiki/{quote(title.replace(' ', '_'))}"
+        article = parse_article(normalize_url(url), self.backend, ttl_bucket(WIKIPEDIA_CACHE_TTL))
+        if article is None:
+            return f"No Wikipedia page found for '{query}'. Try a different query."
+        if self.content_type == "summary":
+            lead = article.sections
+            while not lead.elements and lead.children:
+                lead = lead.children[0]
+            text = "\n\n".join(lead.elements)
+        else:
+            text = "\n\n".join(article.sections.render())
+        return f"✅ **Wikipedia Page:** {title}\n\n**Content:** {text}\n\n🔗 **Read more:** {url}"
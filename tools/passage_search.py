@@ -0,0 +1,172 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from smolagents import Tool
+
+PASSAGE_CHARS: int = int(os.getenv("PASSAGE_CHARS", default=800))
+PASSAGE_SEARCH_TOP_K: int = int(os.getenv("PASSAGE_SEARCH_TOP_K", default=5))
+PASSAGE_INDEX_CACHE_SIZE: int = int(os.getenv("PASSAGE_INDEX_CACHE_SIZE", default=16))
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into case-folded word tokens.
+    """
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def chunk_text(text: str, max_chars: int = PASSAGE_CHARS) -> list[str]:
+    """
+    Splits text into passages of about `max_chars` characters.
+
+    Consecutive short paragraphs are packed together; paragraphs longer than
+    `max_chars` are cut on sentence or word boundaries, each piece overlapping
+    the previous one by a few words so no phrase is lost at a cut.
+
+    Args:
+        text (str): The text to split.
+        max_chars (int): The target passage length.
+    Returns:
+        list[str]: The passages, in document order.
+    """
+    passages: list[str] = []
+    current = ""
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            passages.append(current)
+            current = ""
+        if len(paragraph) <= max_chars:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+            continue
+        start = 0
+        while start < len(paragraph):
+            end = min(start + max_chars, len(paragraph))
+            if end < len(paragraph):
+                cut = max(paragraph.rfind(". ", start, end), paragraph.rfind(" ", start, end))
+                if cut > start + max_chars // 2:
+                    end = cut + 1
+            passages.append(paragraph[start:end].strip())
+            if end >= len(paragraph):
+                break
+            # Step back a few words so the next passage overlaps this one
+            overlap = paragraph.rfind(" ", start, max(end - max_chars // 10, start + 1))
+            start = overlap + 1 if overlap > start else end
+    if current:
+        passages.append(current)
+    return passages
+
+
+class BM25Index:
+    """
+    An in-memory Okapi BM25 index over the passages of one document.
+    """
+
+    def __init__(self, passages: list[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            passages (list[str]): The passages to index.
+            k1 (float): The term frequency saturation.
+            b (float): The passage length normalization.
+        """
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self.lengths: list[int] = []
+        # Term -> (passage index, term frequency) postings
+        self.postings: dict[str, list[tuple[int, int]]] = {}
+        for i, passage in enumerate(passages):
+            counts = Counter(tokenize(passage))
+            self.lengths.append(sum(counts.values()))
+            for term, frequency in counts.items():
+                self.postings.setdefault(term, []).append((i, frequency))
+        self.average_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+
+    def search(self, query: str, top_k: int) -> list[tuple[int, float]]:
+        """
+        Ranks the passages against a query.
+
+        Args:
+            query (str): The query.
+            top_k (int): The number of passages to return.
+        Returns:
+            list[tuple[int, float]]: The indices and scores of the best passages, best first.
+        """
+        scores: dict[int, float] = {}
+        n = len(self.passages)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[i] / self.average_length)
+                scores[i] = scores.get(i, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+
+_index_cache: OrderedDict[str, BM25Index] = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+
+def get_index(text: str) -> BM25Index:
+    """
+    Returns the BM25 index of a document, building it on the first query.
+
+    Args:
+        text (str): The document.
+    Returns:
+        BM25Index: The index, shared by every query on the same text.
+    """
+    key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    with _index_cache_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    index = BM25Index(chunk_text(text))
+    with _index_cache_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > PASSAGE_INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+class PassageSearch(Tool):
+    name: str = "passage_search_tool"
+    description: str = (
+        "This tool finds the passages of a long text most relevant to a query, ranked by BM25. "
+        "Use it on the output of visit_webpage, wikipedia_parser_tool or open_files_tool "
+        "instead of reading the whole text."
+    )
+    inputs: dict[str, dict[str, str]] = {
+        "text": {
+            "type": "string",
+            "description": "The long text to search through.",
+        },
+        "query": {
+            "type": "string",
+            "description": "Keywords describing what to look for.",
+        },
+        "top_k": {
+            "type": "integer",
+            "description": "The number of passages to return. Defaults to 5.",
+            "nullable": True,
+        },
+    }
+    output_type: str = "array"
+
+    def forward(self, text: str, query: str, top_k: int | None = None) -> list[str]:
+        """
+        Returns the passages of `text` that best match `query`, best first.
+        """
+        index = get_index(text)
+        ranked = index.search(query, top_k or PASSAGE_SEARCH_TOP_K)
+        return [index.passages[i] for i, _ in ranked]
@@ -2,19 +2,12 @@ from smolagents import Tool
 import os
 import time
 import tempfile
-from transformers import pipeline
 from typing import List, Dict
 from PIL import Image
 import io
 
-# Import required browser automation libraries
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-import helium
+# transformers, selenium and helium are heavy to import, so they are only
+# imported by the methods that need them, on first use of the tool.
 
 
 class WebVideoAnalyzerTool(Tool):
@@ -41,9 +34,14 @@ class WebVideoAnalyzerTool(Tool):
         },
     }
     output_type = "string"
+    driver = None
+    detector = None
 
     def _setup_browser(self):
         """Initialize the browser with appropriate settings."""
+        import helium
+        from selenium import webdriver
+
         if self.driver is not None:
             return self.driver
 
@@ -63,6 +61,11 @@ class WebVideoAnalyzerTool(Tool):
 
     def _navigate_to_video(self, url: str) -> bool:
         """Navigate to the video URL and prepare for playback."""
+        import helium
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+
         try:
             print(f"Navigating to {url}...")
             helium.go_to(url)
@@ -123,6 +126,10 @@ class WebVideoAnalyzerTool(Tool):
 
     def _close_popups(self):
         """Attempt to close any popups or overlays."""
+        from selenium import webdriver
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+
         try:
             # Try pressing Escape key to close general popups
             webdriver.ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
@@ -149,11 +156,14 @@ class WebVideoAnalyzerTool(Tool):
 
     def _analyze_screenshot(self, image: Image.Image, label: str) -> int:
         """Count objects of the specified label in a screenshot."""
-        detector = pipeline("object-detection", model="facebook/detr-resnet-50")
+        if self.detector is None:
+            from transformers import pipeline
+
+            self.detector = pipeline("object-detection", model="facebook/detr-resnet-50")
 
         try:
             # Run detection on the image
-            results = detector(image)
+            results = self.detector(image)
 
             # Count objects matching the label
             object_count = sum(
@@ -228,6 +238,8 @@ class WebVideoAnalyzerTool(Tool):
         Returns:
             str: A detailed report of object counts over time.
         """
+        import helium
+
         try:
             # Setup the browser
             self._setup_browser()
@@ -0,0 +1,171 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+from smolagents import DuckDuckGoSearchTool
+
+from utils.lru_store import SQLiteLRUStore
+from utils.rate_limiter import RateLimiter
+
+WEB_SEARCH_CACHE_ENABLED: bool = os.getenv("WEB_SEARCH_CACHE_ENABLED", default="true").lower() in ("1", "true", "yes")
+WEB_SEARCH_CACHE_PATH: str = os.getenv("WEB_SEARCH_CACHE_PATH", default=".cache/web_search.sqlite3")
+WEB_SEARCH_CACHE_MAX_BYTES: int = int(os.getenv("WEB_SEARCH_CACHE_MAX_BYTES", default=32 * 1024 * 1024))
+WEB_SEARCH_CACHE_TTL: float = float(os.getenv("WEB_SEARCH_CACHE_TTL", default=7 * 24 * 3600))
+WEB_SEARCH_REQUESTS_PER_MINUTE: int = int(os.getenv("WEB_SEARCH_REQUESTS_PER_MINUTE", default=20))
+WEB_SEARCH_MAX_RETRIES: int = int(os.getenv("WEB_SEARCH_MAX_RETRIES", default=2))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a search query so trivially different spellings share a cache entry.
+
+    Args:
+        query (str): The search query.
+    Returns:
+        str: The query, case-folded with its whitespace collapsed.
+    """
+    return re.sub(r"\s+", " ", query).strip().casefold()
+
+
+_search_limiter: RateLimiter | None = None
+_search_cache: SQLiteLRUStore | None = None
+_search_lock = threading.Lock()
+# Normalized query -> the pending search every concurrent caller waits on
+_in_flight: dict[str, Future] = {}
+_stats: dict[str, int] = {"hits": 0, "coalesced": 0, "misses": 0}
+
+
+def get_search_limiter() -> RateLimiter:
+    """
+    Returns the process-wide search request budget, creating it on first use.
+
+    Returns:
+        RateLimiter: The shared limiter, with `WEB_SEARCH_REQUESTS_PER_MINUTE` requests and no token budget.
+    """
+    global _search_limiter
+    with _search_lock:
+        if _search_limiter is None:
+            _search_limiter = RateLimiter(
+                requests_per_minute=WEB_SEARCH_REQUESTS_PER_MINUTE,
+                tokens_per_minute=0,
+                max_retries=WEB_SEARCH_MAX_RETRIES,
+            )
+        return _search_limiter
+
+
+def set_search_limiter(limiter: RateLimiter) -> None:
+    """
+    Replaces the process-wide search request budget, e.g. with a proxy to the limiter of a parent process.
+    """
+    global _search_limiter
+    with _search_lock:
+        _search_limiter = limiter
+
+
+def get_search_cache() -> SQLiteLRUStore | None:
+    """
+    Returns the process-wide search result cache, or None when `WEB_SEARCH_CACHE_ENABLED` is off.
+
+    Returns:
+        SQLiteLRUStore | None: The shared cache.
+    """
+    global _search_cache
+    if not WEB_SEARCH_CACHE_ENABLED:
+        return None
+    with _search_lock:
+        if _search_cache is None:
+            _search_cache = SQLiteLRUStore(
+                WEB_SEARCH_CACHE_PATH, WEB_SEARCH_CACHE_MAX_BYTES, table="web_search"
+            )
+        return _search_cache
+
+
+class CachedWebSearchTool(DuckDuckGoSearchTool):
+    """
+    `DuckDuckGoSearchTool` with a persistent result cache and a shared request budget.
+
+    Results are cached for `WEB_SEARCH_CACHE_TTL` seconds under the normalized
+    query. Concurrent agents asking the same query share a single request, and
+    all searches in the process draw from one `WEB_SEARCH_REQUESTS_PER_MINUTE`
+    budget, pausing together when DuckDuckGo starts rate limiting.
+    """
+
+    def _search(self, query: str) -> str:
+        limiter = get_search_limiter()
+        for attempt in range(limiter.max_retries + 1):
+            limiter.acquire(0)
+            try:
+                return super().forward(query)
+            except Exception as e:
+                if type(e).__name__ != "RatelimitException" or attempt == limiter.max_retries:
+                    raise
+                delay = limiter.backoff(attempt)
+                print(f"Web search rate limited, pausing searches for {delay:.1f}s")
+
+    def forward(self, query: str) -> str:
+        key = f"{self.max_results}:{normalize_query(query)}"
+        cache = get_search_cache()
+        if cache is not None:
+            entry = cache.get(key)
+            if entry is not None and time.time() < entry[1]["expires_at"]:
+                with _search_lock:
+                    _stats["hits"] += 1
+                return entry[0].decode("utf-8")
+
+        with _search_lock:
+            pending = _in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = _in_flight[key] = Future()
+            _stats["misses" if owner else "coalesced"] += 1
+        if not owner:
+            return pending.result()
+
+        try:
+            result = self._search(query)
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        else:
+            pending.set_result(result)
+            if cache is not None:
+                cache.put(
+                    key, result.encode("utf-8"), {"expires_at": time.time() + WEB_SEARCH_CACHE_TTL}
+                )
+            return result
+        finally:
+            with _search_lock:
+                del _in_flight[key]
+
+
+def search_stats() -> dict:
+    """
+    Returns the cache hit, coalesced and live search counters of the process.
+    """
+    with _search_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    stats["hit_rate"] = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+    return stats
+
+
+def drain_search_counters() -> dict[str, int]:
+    """
+    Returns the search counters and resets them, so a worker process can report them to its parent.
+    """
+    with _search_lock:
+        counters = dict(_stats)
+        for name in _stats:
+            _stats[name] = 0
+    return counters
+
+
+def add_search_counters(counters: dict[str, int]) -> None:
+    """
+    Adds counters drained in a worker process to the counters of this process.
+    """
+    with _search_lock:
+        for name, count in counters.items():
+            _stats[name] += count
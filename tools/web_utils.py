@@ -1,7 +1,4 @@
 from smolagents import tool
-from selenium import webdriver
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.by import By
 
 driver = None
 
@@ -14,6 +11,8 @@ def search_item_ctrl_f(text: str, nth_result: int = 1) -> str:
         text: The text to search for
         nth_result: Which occurrence to jump to (default: 1)
     """
+    from selenium.webdriver.common.by import By
+
     if driver:
         elements = driver.find_elements(By.XPATH, f"//*[contains(text(), '{text}')]")
         if nth_result > len(elements):
@@ -40,5 +39,8 @@ def close_popups() -> str:
     Closes any visible modal or pop-up on the page. Use this to dismiss pop-up windows!
     This does not work on cookie consent banners.
     """
+    from selenium import webdriver
+    from selenium.webdriver.common.keys import Keys
+
     if driver:
         webdriver.ActionChains(driver).send_keys(Keys.ESCAPE).perform()
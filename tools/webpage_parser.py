@@ -1,28 +1,124 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
 from bs4 import BeautifulSoup
 from smolagents import Tool
+from utils.html_parsing import resolve_parser_backend
+
+WEBPAGE_PARSER_LIMIT: int = int(os.getenv("WEBPAGE_PARSER_LIMIT", default=50))
+# Parsed DOMs take several times the size of their HTML, so only a few are kept
+WEBPAGE_PARSER_CACHE_SIZE: int = int(os.getenv("WEBPAGE_PARSER_CACHE_SIZE", default=8))
+
+_dom_cache: OrderedDict[str, BeautifulSoup] = OrderedDict()
+_dom_cache_lock = threading.Lock()
+
+
+def parse_dom(html_string: str, backend: str = "html.parser") -> BeautifulSoup:
+    """
+    Parses an HTML document, reusing the tree of an identical document parsed recently.
+
+    Args:
+        html_string (str): The HTML content as a string.
+        backend (str): The BeautifulSoup tree builder.
+    Returns:
+        BeautifulSoup: The parsed document.
+    """
+    key = hashlib.sha256(f"{backend}\n{html_string}".encode("utf-8")).hexdigest()
+    with _dom_cache_lock:
+        soup = _dom_cache.get(key)
+        if soup is not None:
+            _dom_cache.move_to_end(key)
+            return soup
+    soup = BeautifulSoup(html_string, backend)
+    with _dom_cache_lock:
+        _dom_cache[key] = soup
+        while len(_dom_cache) > WEBPAGE_PARSER_CACHE_SIZE:
+            _dom_cache.popitem(last=False)
+    return soup
 
 
 class WebpageParser(Tool):
     name: str = "webpage_parser_tool"
     description: str = (
-        "This tool parses elements from HTML to make them easily searchable."
+        "This tool parses elements from HTML to make them easily searchable. "
+        "Pass either a CSS selector, or a tag and/or attributes, to get the text of the "
+        "matching elements only; without a query it returns the raw HTML of the first elements."
     )
     inputs: dict[str, dict[str, str]] = {
         "html_string": {
             "type": "string",
             "description": "The HTML content as a string.",
         },
+        "selector": {
+            "type": "string",
+            "description": "A CSS selector, e.g. 'table.wikitable td' or 'a[href*=\"/wiki/\"]'. "
+            "Cannot be combined with tag or attributes, write them into the selector instead.",
+            "nullable": True,
+        },
+        "tag": {
+            "type": "string",
+            "description": "The tag name of the elements to return, e.g. 'h2'.",
+            "nullable": True,
+        },
+        "attributes": {
+            "type": "object",
+            "description": "Attribute values the elements must have, e.g. {'class': 'infobox'}.",
+            "nullable": True,
+        },
+        "limit": {
+            "type": "integer",
+            "description": "The maximum number of elements to return. Defaults to 50.",
+            "nullable": True,
+        },
     }
     output_type: str = "array"
 
-    def forward(self, html_string: str) -> list[str]:
+    def __init__(self, backend: str = "html.parser", *args, **kwargs):
         """
-        Parses the HTML string and returns all elements as an array.
+        Args:
+            backend (str): The BeautifulSoup tree builder, see `resolve_parser_backend`.
         """
-        # Create a BeautifulSoup object
-        soup = BeautifulSoup(html_string, "html.parser")
+        super().__init__(*args, **kwargs)
+        self.backend = resolve_parser_backend(backend)
+
+    def forward(
+        self,
+        html_string: str,
+        selector: str | None = None,
+        tag: str | None = None,
+        attributes: dict | None = None,
+        limit: int | None = None,
+    ) -> list[str]:
+        """
+        Parses the HTML string and returns the text of the matching elements.
+
+        Without a selector, tag or attributes, returns the first `limit` elements as an array
+        of HTML strings.
+        """
+        if selector and (tag or attributes):
+            raise ValueError(
+                "Pass either a selector, or a tag and/or attributes, not both: "
+                "write the tag and attributes into the selector, e.g. 'div.infobox td'."
+            )
+
+        soup = parse_dom(html_string, self.backend)
+        limit = limit or WEBPAGE_PARSER_LIMIT
+
+        if not (selector or tag or attributes):
+            # Extract the first elements as strings
+            elements = [str(element) for element in soup.find_all(limit=limit)]
+
+            return elements
 
-        # Extract all elements as strings
-        elements = [str(element) for element in soup.find_all()]
+        if selector:
+            matches = soup.select(selector, limit=limit)
+        else:
+            matches = soup.find_all(tag, attrs=attributes or {}, limit=limit)
 
-        return elements
+        results = []
+        for element in matches:
+            text = element.get_text(separator=" ", strip=True)
+            link = element.get("href") or element.get("src")
+            results.append(f"{text} ({link})" if link else text)
+        return results
@@ -1,7 +1,14 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from queue import Queue
+from typing import Callable, Iterator
+
 import requests
 from smolagents import CodeAgent
 from tqdm import tqdm
 from prompts.default_prompt import generate_prompt
+from utils.checkpoint import AnswerStore
+from utils.http_client import http_get, http_post
 
 DEFAULT_API_URL: str = "https://agents-course-unit4-scoring.hf.space"
 
@@ -19,7 +26,7 @@ def get_questions(questions_endpoint: str = "/questions") -> list[dict]:
 
     api_url = DEFAULT_API_URL + questions_endpoint
     try:
-        response = requests.get(api_url, timeout=15)
+        response = http_get(api_url, timeout=15)
         response.raise_for_status()
         questions_data = response.json()
         if not questions_data:
@@ -35,48 +42,199 @@ def get_questions(questions_endpoint: str = "/questions") -> list[dict]:
         return []
 
 
-def run_agent(agent: CodeAgent, questions: list[dict]) -> list[str]:
+def answer_question(
+    agent: CodeAgent, question: dict, store: AnswerStore | None = None
+) -> tuple[dict, dict] | None:
     """
-    Runs the agent on the provided questions.
+    Runs the agent on a single question, isolating any error it raises.
+
+    When a store is given, a valid stored answer is reused instead of running
+    the agent, and the outcome of a new run is recorded as soon as it is known.
 
     Args:
         agent (CodeAgent): The agent to run.
-        questions (list[str]): A list of questions to be answered.
+        question (dict): The question to be answered.
+        store (AnswerStore | None): The checkpoint store for answers.
 
     Returns:
-        list[str]: A list of answers from the agent.
+        tuple[dict, dict] | None: The answer payload (None when the agent failed)
+            and the results log entry, or None if the question was skipped.
     """
-    results_log = []
-    answers_payload = []
-    for question in tqdm(questions, desc="Running agent"):
-        task_id = question.get("task_id")
-        question_text = question.get("question")
-        file_name = question.get("file_name")
-        prompt = generate_prompt(question_text, file_name)
-
-        if not task_id or question_text is None:
-            print(f"Skipping item with missing task_id or question: {question}")
-            continue
+    task_id = question.get("task_id")
+    question_text = question.get("question")
+    file_name = question.get("file_name")
 
-        try:
-            answer = agent(prompt)
-            answers_payload.append({"task_id": task_id, "submitted_answer": answer})
-            results_log.append(
-                {
-                    "Task ID": task_id,
-                    "Question": question_text,
-                    "Submitted Answer": answer,
-                }
-            )
-        except Exception as e:
-            print(f"Error running agent on task '{task_id}': {e}")
-            results_log.append(
+    if not task_id or question_text is None:
+        print(f"Skipping item with missing task_id or question: {question}")
+        return None
+
+    prompt = generate_prompt(question_text, file_name)
+    if store is not None:
+        stored = store.get(task_id, prompt)
+        if stored is not None:
+            print(f"Reusing stored answer for task '{task_id}'.")
+            return (
+                stored,
                 {
                     "Task ID": task_id,
                     "Question": question_text,
-                    "Submitted Answer": f"AGENT ERROR: {e}",
-                }
+                    "Submitted Answer": stored["submitted_answer"],
+                    "Elapsed (s)": 0.0,
+                },
             )
+
+    start = time.perf_counter()
+    try:
+        answer = agent(prompt, task_id=task_id)
+        if store is not None:
+            store.put(task_id, prompt, question_text, answer=answer)
+        return (
+            {"task_id": task_id, "submitted_answer": answer},
+            {
+                "Task ID": task_id,
+                "Question": question_text,
+                "Submitted Answer": answer,
+                "Elapsed (s)": round(time.perf_counter() - start, 1),
+            },
+        )
+    except Exception as e:
+        print(f"Error running agent on task '{task_id}': {e}")
+        if store is not None:
+            store.put(task_id, prompt, question_text, error=str(e))
+        return (
+            None,
+            {
+                "Task ID": task_id,
+                "Question": question_text,
+                "Submitted Answer": f"AGENT ERROR: {e}",
+                "Elapsed (s)": round(time.perf_counter() - start, 1),
+            },
+        )
+
+
+def _collect_results(
+    results: list[tuple[dict, dict] | None],
+) -> tuple[list[dict], list[dict]]:
+    results_log = []
+    answers_payload = []
+    for result in results:
+        if result is None:
+            continue
+        payload, log_entry = result
+        if payload is not None:
+            answers_payload.append(payload)
+        results_log.append(log_entry)
+    return answers_payload, results_log
+
+
+def iter_questions(
+    agents: list[CodeAgent],
+    questions: list[dict],
+    store: AnswerStore | None = None,
+) -> Iterator[tuple[int, tuple[dict, dict] | None]]:
+    """
+    Runs a pool of agents concurrently and yields each result as it completes.
+
+    Every agent is owned by one worker at a time, since agent memory cannot be
+    shared between tasks that run in parallel. The pool size is the number of
+    agents given. If the caller stops iterating early, tasks already queued
+    keep running in the background so their answers still reach the store.
+
+    Args:
+        agents (list[CodeAgent]): The agents to run, one per worker.
+        questions (list[dict]): A list of questions to be answered.
+        store (AnswerStore | None): The checkpoint store; tasks that already
+            have a valid answer in it are not run again.
+
+    Yields:
+        tuple[int, tuple[dict, dict] | None]: The index of the question and the
+            result of `answer_question`, in completion order.
+    """
+    if not agents:
+        raise ValueError("At least one agent is required to run questions.")
+
+    pool: Queue = Queue()
+    for agent in agents:
+        pool.put(agent)
+
+    def _run(question: dict) -> tuple[dict, dict] | None:
+        agent = pool.get()
+        try:
+            return answer_question(agent, question, store)
+        finally:
+            pool.put(agent)
+
+    max_workers = max(1, min(len(agents), len(questions)))
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {
+            executor.submit(_run, question): index
+            for index, question in enumerate(questions)
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(wait=False)
+
+
+def run_questions(
+    agents: list[CodeAgent],
+    questions: list[dict],
+    store: AnswerStore | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """
+    Runs a pool of agents concurrently over the provided questions.
+
+    Answers are returned in the order of `questions`, whatever the order in
+    which the tasks complete.
+
+    Args:
+        agents (list[CodeAgent]): The agents to run, one per worker.
+        questions (list[dict]): A list of questions to be answered.
+        store (AnswerStore | None): The checkpoint store; tasks that already
+            have a valid answer in it are not run again.
+
+    Returns:
+        tuple[list[dict], list[dict]]: The answers payload and the results log.
+    """
+    results = [None] * len(questions)
+    for index, result in tqdm(
+        iter_questions(agents, questions, store),
+        total=len(questions),
+        desc="Running agent",
+    ):
+        results[index] = result
+    return _collect_results(results)
+
+
+def run_agent(
+    agent: CodeAgent,
+    questions: list[dict],
+    max_workers: int = 1,
+    agent_factory: Callable[[], CodeAgent] | None = None,
+    store: AnswerStore | None = None,
+) -> list[str]:
+    """
+    Runs the agent on the provided questions.
+
+    Args:
+        agent (CodeAgent): The agent to run.
+        questions (list[str]): A list of questions to be answered.
+        max_workers (int): The number of questions to answer concurrently.
+        agent_factory (Callable[[], CodeAgent] | None): Builds the additional
+            agents needed when `max_workers` is greater than one.
+        store (AnswerStore | None): The checkpoint store for answers.
+
+    Returns:
+        list[str]: A list of answers from the agent.
+    """
+    agents = [agent]
+    if max_workers > 1:
+        if agent_factory is None:
+            raise ValueError("agent_factory is required when max_workers > 1.")
+        agents += [agent_factory() for _ in range(max_workers - 1)]
+
+    answers_payload, results_log = run_questions(agents, questions, store)
     if not answers_payload:
         print("Agent did not produce any answers to submit.")
         return results_log
@@ -100,7 +258,7 @@ def submit_answers(
     }
     submit_url: str = DEFAULT_API_URL + submission_endpoint
     try:
-        response = requests.post(submit_url, json=submission_data, timeout=60)
+        response = http_post(submit_url, json=submission_data, timeout=60)
         response.raise_for_status()
         result_data = response.json()
         final_status = (
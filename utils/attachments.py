@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.http_client import http_get
+
+ATTACHMENTS_URL: str = os.getenv(
+    "ATTACHMENTS_URL", default="https://agents-course-unit4-scoring.hf.space/files"
+)
+ATTACHMENTS_DIR: str = os.getenv("ATTACHMENTS_DIR", default=".cache/attachments")
+ATTACHMENTS_PREFETCH_WORKERS: int = int(os.getenv("ATTACHMENTS_PREFETCH_WORKERS", default=8))
+
+MANIFEST_NAME: str = "manifest.json"
+# Attachments are named after their task, e.g. "cca530fc-4052-43b2-b130-b30968d8aa44.xlsx"
+TASK_ID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+# One lock per task, so a prefetch and a tool call never download the same file twice
+_task_locks: dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _task_lock(task_id: str) -> threading.Lock:
+    with _registry_lock:
+        if task_id not in _task_locks:
+            _task_locks[task_id] = threading.Lock()
+        return _task_locks[task_id]
+
+
+def _write_atomic(path: str, write) -> None:
+    """
+    Writes a file through a temporary file in the same directory, then renames it into place.
+
+    Readers see either the previous file or the complete new one, never a partial write.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def attachment_path(task_id: str, file_name: str, cache_dir: str = ATTACHMENTS_DIR) -> str:
+    """
+    Returns where the attachment of a task is cached.
+    """
+    return os.path.join(cache_dir, task_id, os.path.basename(file_name))
+
+
+def is_valid(task_id: str, file_name: str, cache_dir: str = ATTACHMENTS_DIR) -> bool:
+    """
+    Tells whether the cached attachment of a task matches the size and sha256 recorded when it was downloaded.
+
+    The file is only hashed again when its modification time changed since it was recorded.
+    """
+    path = attachment_path(task_id, file_name, cache_dir)
+    try:
+        with open(os.path.join(cache_dir, task_id, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        stat = os.stat(path)
+        if stat.st_size != manifest["size"]:
+            return False
+        if stat.st_mtime_ns == manifest.get("mtime_ns"):
+            return True
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest() == manifest["sha256"]
+    except (OSError, ValueError, KeyError):
+        return False
+
+
+def download_attachment(task_id: str, file_name: str, cache_dir: str = ATTACHMENTS_DIR) -> str:
+    """
+    Downloads the attachment of a task into the cache, unless a valid copy is already there.
+
+    The body is streamed to a temporary file, checked against the response's
+    Content-Length, and renamed into place; its size and sha256 are then
+    recorded in the task's manifest. A failed or truncated download raises
+    and leaves no file behind.
+
+    Args:
+        task_id (str): The task the file is attached to.
+        file_name (str): The name of the attachment.
+        cache_dir (str): The root directory of the cache.
+    Returns:
+        str: The path of the cached file.
+    """
+    path = attachment_path(task_id, file_name, cache_dir)
+    with _task_lock(task_id):
+        if is_valid(task_id, file_name, cache_dir):
+            return path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        response = http_get(f"{ATTACHMENTS_URL}/{task_id}", stream=True)
+        digest = hashlib.sha256()
+        size = 0
+
+        def write(f) -> None:
+            nonlocal size
+            with response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            expected = response.headers.get("Content-Length")
+            # Compressed bodies are decoded while streaming, so only identity lengths are comparable
+            if expected and not response.headers.get("Content-Encoding") and int(expected) != size:
+                raise IOError(f"Truncated download of '{file_name}': {size} of {expected} bytes")
+
+        _write_atomic(path, write)
+        manifest = {
+            "file_name": file_name,
+            "size": size,
+            "sha256": digest.hexdigest(),
+            "mtime_ns": os.stat(path).st_mtime_ns,
+        }
+        _write_atomic(
+            os.path.join(cache_dir, task_id, MANIFEST_NAME),
+            lambda f: f.write(json.dumps(manifest).encode("utf-8")),
+        )
+        return path
+
+
+def publish_attachment(path: str, file_name: str) -> None:
+    """
+    Makes a cached attachment available under the name the prompt gives the agent.
+
+    The name is hard-linked to the cached file, or gets a copy of it when the
+    filesystem does not allow links, and swapped in atomically, so code the
+    agent writes, e.g. `pd.read_excel(file_name)`, opens the validated file.
+    """
+    if os.path.exists(file_name) and os.path.samefile(path, file_name):
+        return
+    if os.path.dirname(file_name):
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    tmp_path = f"{file_name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(path, tmp_path)
+    except OSError:
+        shutil.copyfile(path, tmp_path)
+    os.replace(tmp_path, file_name)
+
+
+def is_attachment_name(file_name: str) -> bool:
+    """
+    Tells whether a file name is a bare task attachment name, "<task_id>.<ext>".
+    """
+    return os.path.basename(file_name) == file_name and bool(
+        TASK_ID_PATTERN.match(file_name.split(".")[0])
+    )
+
+
+def resolve_attachment(file_name: str, cache_dir: str = ATTACHMENTS_DIR) -> str:
+    """
+    Returns a local path for a file the agent asked to open.
+
+    Task attachments are served from the cache, downloading them first if the
+    prefetch did not, and published under their own name in the working
+    directory. Other existing local files are used as they are; other missing
+    names are still tried as attachments, named after their task_id.
+
+    Args:
+        file_name (str): The path or attachment name given to the tool.
+        cache_dir (str): The root directory of the cache.
+    Returns:
+        str: The path of the file to open.
+    """
+    if not is_attachment_name(file_name) and os.path.exists(file_name):
+        return file_name
+    task_id = os.path.basename(file_name).split(".")[0]
+    path = download_attachment(task_id, file_name, cache_dir)
+    publish_attachment(path, file_name)
+    return path
+
+
+def prefetch_attachments(
+    questions: list[dict],
+    max_workers: int = ATTACHMENTS_PREFETCH_WORKERS,
+    cache_dir: str = ATTACHMENTS_DIR,
+) -> dict[str, str]:
+    """
+    Downloads the attachments of all questions concurrently, before any agent runs.
+
+    Each file is also published under its name in the working directory, see
+    `publish_attachment`.
+
+    Failures are reported and skipped: the tool downloads a missing file
+    again when the agent opens it.
+
+    Args:
+        questions (list[dict]): The questions, with their `task_id` and `file_name`.
+        max_workers (int): The number of concurrent downloads.
+        cache_dir (str): The root directory of the cache.
+    Returns:
+        dict[str, str]: The cached path of each attachment, by task_id.
+    """
+    attachments = {
+        question["task_id"]: question["file_name"]
+        for question in questions
+        if question.get("task_id") and question.get("file_name")
+    }
+    if not attachments:
+        return {}
+
+    def fetch(item: tuple[str, str]) -> tuple[str, str | None]:
+        task_id, file_name = item
+        try:
+            path = download_attachment(task_id, file_name, cache_dir)
+            publish_attachment(path, file_name)
+            return task_id, path
+        except Exception as e:
+            print(f"Error prefetching attachment '{file_name}' of task '{task_id}': {e}")
+            return task_id, None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(attachments)))) as executor:
+        paths = {task_id: path for task_id, path in executor.map(fetch, attachments.items()) if path}
+    print(f"Prefetched {len(paths)}/{len(attachments)} attachments into {cache_dir}.")
+    return paths
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from prompts.default_prompt import generate_prompt
+
+ANSWERS_DB_PATH: str = os.getenv("ANSWERS_DB_PATH", default=".cache/answers.sqlite3")
+
+
+def hash_text(text: str) -> str:
+    """
+    Returns the SHA-256 hex digest of a string.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def agent_config_hash(agent_args: dict) -> str:
+    """
+    Hashes the parts of an agent configuration that change its answers.
+
+    Args:
+        agent_args (dict): The keyword arguments used to build the agent, e.g. `DEFAULT_ARGS`.
+    Returns:
+        str: A hash of the model ID, temperature and tool set.
+    """
+    config = {
+        "model_id": agent_args.get("model_id"),
+        "temperature": agent_args.get("temperature"),
+        "tools": sorted(tool.name for tool in agent_args.get("tools", [])),
+    }
+    return hash_text(json.dumps(config, sort_keys=True))
+
+
+class AnswerStore:
+    """
+    A persistent store of agent answers backed by SQLite.
+
+    Answers are keyed by task ID, the hash of the prompt sent to the agent and
+    the hash of the agent configuration, so a changed prompt or model never
+    reuses a stale answer. Failed tasks are recorded with their error and are
+    not considered answered.
+    """
+
+    def __init__(self, agent_args: dict, path: str = ANSWERS_DB_PATH):
+        """
+        Args:
+            agent_args (dict): The keyword arguments used to build the agent.
+            path (str): The path of the SQLite database.
+        """
+        self.path = path
+        self.config_hash = agent_config_hash(agent_args)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS answers (
+                    task_id TEXT NOT NULL,
+                    prompt_hash TEXT NOT NULL,
+                    config_hash TEXT NOT NULL,
+                    question TEXT,
+                    answer TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (task_id, prompt_hash, config_hash)
+                )
+                """
+            )
+
+    def get(self, task_id: str, prompt: str) -> dict | None:
+        """
+        Looks up a valid answer for a task.
+
+        Args:
+            task_id (str): The task ID.
+            prompt (str): The prompt sent to the agent.
+        Returns:
+            dict | None: The answer payload, or None if the task has no valid answer.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer FROM answers WHERE task_id = ? AND prompt_hash = ? "
+                "AND config_hash = ? AND error IS NULL",
+                (task_id, hash_text(prompt), self.config_hash),
+            ).fetchone()
+        if row is None:
+            return None
+        return {"task_id": task_id, "submitted_answer": json.loads(row[0])}
+
+    def put(
+        self,
+        task_id: str,
+        prompt: str,
+        question: str,
+        answer=None,
+        error: str | None = None,
+    ) -> None:
+        """
+        Records the outcome of a task as soon as it finishes.
+
+        Args:
+            task_id (str): The task ID.
+            prompt (str): The prompt sent to the agent.
+            question (str): The question text, kept for the results table.
+            answer: The answer returned by the agent.
+            error (str | None): The error raised by the agent, if it failed.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    task_id,
+                    hash_text(prompt),
+                    self.config_hash,
+                    question,
+                    json.dumps(answer, default=str),
+                    error,
+                    time.time(),
+                ),
+            )
+
+    def _current_rows(self, questions: list[dict]) -> list[tuple]:
+        """
+        Returns the stored outcome of each question for its current prompt, in question order.
+
+        Only the row matching the prompt the question produces now is read, so a
+        changed prompt or a newer failed attempt is never covered by an older answer.
+        """
+        rows = []
+        with self._lock:
+            for question in questions:
+                task_id = question.get("task_id")
+                if not task_id or question.get("question") is None:
+                    continue
+                prompt = generate_prompt(question["question"], question.get("file_name"))
+                row = self._conn.execute(
+                    "SELECT task_id, question, answer, error FROM answers "
+                    "WHERE task_id = ? AND prompt_hash = ? AND config_hash = ?",
+                    (task_id, hash_text(prompt), self.config_hash),
+                ).fetchone()
+                if row is not None:
+                    rows.append(row)
+        return rows
+
+    def answers(self, questions: list[dict]) -> list[dict]:
+        """
+        Returns the valid answers to the current questions for this configuration.
+
+        Args:
+            questions (list[dict]): The questions being submitted.
+        Returns:
+            list[dict]: The answers payload ready for submission.
+        """
+        return [
+            {"task_id": task_id, "submitted_answer": json.loads(answer)}
+            for task_id, _, answer, error in self._current_rows(questions)
+            if error is None
+        ]
+
+    def results_log(self, questions: list[dict]) -> list[dict]:
+        """
+        Returns the latest outcome of each current question for this configuration.
+
+        Args:
+            questions (list[dict]): The questions being submitted.
+        Returns:
+            list[dict]: The results log, including failed tasks.
+        """
+        return [
+            {
+                "Task ID": task_id,
+                "Question": question,
+                "Submitted Answer": f"AGENT ERROR: {error}" if error else json.loads(answer),
+            }
+            for task_id, question, answer, error in self._current_rows(questions)
+        ]
@@ -0,0 +1,17 @@
+def resolve_parser_backend(backend: str = "auto") -> str:
+    """
+    Resolves the BeautifulSoup tree builder to parse HTML with.
+
+    Args:
+        backend (str): "auto", "lxml", "html.parser" or any other builder name. "auto"
+            picks lxml when it is installed and falls back to the pure-Python "html.parser".
+    Returns:
+        str: The builder name.
+    """
+    if backend != "auto":
+        return backend
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return "html.parser"
+    return "lxml"
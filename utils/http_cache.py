@@ -0,0 +1,352 @@
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils.http_client import http_get, read_limited
+from utils.lru_store import SQLiteLRUStore
+
+HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", default="true").lower() in ("1", "true", "yes")
+HTTP_CACHE_PATH: str = os.getenv("HTTP_CACHE_PATH", default=".cache/http_cache.sqlite3")
+HTTP_CACHE_MAX_BYTES: int = int(os.getenv("HTTP_CACHE_MAX_BYTES", default=256 * 1024 * 1024))
+# Comma-separated "domain=seconds" pairs; a domain also matches its subdomains
+HTTP_CACHE_DOMAIN_TTLS: str = os.getenv("HTTP_CACHE_DOMAIN_TTLS", default="wikipedia.org=86400")
+
+# Response headers worth replaying from the cache
+STORED_HEADERS: tuple[str, ...] = (
+    "Content-Type",
+    "Content-Language",
+    "ETag",
+    "Last-Modified",
+    "Cache-Control",
+    "Expires",
+)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a URL so equivalent spellings share a cache entry.
+
+    The scheme and host are lowercased, default ports and the fragment are
+    dropped, and query parameters are sorted.
+
+    Args:
+        url (str): The URL to normalize.
+    Returns:
+        str: The normalized URL.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+        netloc = netloc.rsplit(":", 1)[0]
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or "/", query, ""))
+
+
+def parse_domain_ttls(value: str) -> dict[str, float]:
+    """
+    Parses `HTTP_CACHE_DOMAIN_TTLS` into a domain -> seconds mapping.
+    """
+    ttls = {}
+    for pair in value.split(","):
+        if "=" in pair:
+            domain, seconds = pair.split("=", 1)
+            ttls[domain.strip().lower()] = float(seconds)
+    return ttls
+
+
+def ttl_bucket(seconds: float) -> int:
+    """
+    Returns the current time window of `seconds`, to pass as an extra argument
+    to an `lru_cache`d function so its entries are not reused past that window.
+
+    Args:
+        seconds (float): The TTL; zero or less never expires entries.
+    Returns:
+        int: The index of the current window.
+    """
+    if seconds <= 0:
+        return 0
+    return int(time.time() // seconds)
+
+
+def _cache_control(headers) -> dict[str, str | None]:
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def fetch_limited(
+    url: str,
+    max_bytes: int | None = None,
+    content_types: tuple[str, ...] | None = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Sends a GET request, bounding the size and type of the body it downloads.
+
+    With `max_bytes`, the body is streamed and at most that many bytes are
+    kept; the response's `truncated` attribute tells whether it was cut. With
+    `content_types`, a response of any other type is closed before its body is
+    downloaded, comes back empty and has its `rejected` attribute set.
+
+    Args:
+        url (str): The URL to fetch.
+        max_bytes (int | None): The maximum size of the body to read.
+        content_types (tuple[str, ...] | None): The accepted `Content-Type` prefixes.
+        **kwargs: Additional arguments passed to `http_get`.
+    Returns:
+        requests.Response: The response.
+    """
+    response = http_get(url, stream=bool(max_bytes or content_types), **kwargs)
+    response.truncated = False
+    content_type = response.headers.get("Content-Type", "").lower()
+    response.rejected = bool(
+        content_types and content_type and not content_type.startswith(content_types)
+    )
+    if response.rejected:
+        response._content = b""
+        response.close()
+    elif max_bytes is not None:
+        response.truncated = read_limited(response, max_bytes)
+    return response
+
+
+class HTTPResponseCache:
+    """
+    A persistent cache of successful GET responses with conditional revalidation.
+
+    Freshness follows the response's `Cache-Control: max-age` or `Expires`,
+    unless a per-domain TTL overrides it. Stale entries carrying an `ETag` or
+    `Last-Modified` are revalidated with a conditional request, so an
+    unchanged page costs a 304 instead of a full download. Responses that are
+    neither fresh nor revalidatable are not stored.
+
+    In-memory caches built on top of it (the parsed pages of `visit_webpage`
+    and `parse_wikipedia_table`) skip this revalidation; they are bounded by
+    their own TTLs through `ttl_bucket`.
+    """
+
+    def __init__(
+        self,
+        path: str = HTTP_CACHE_PATH,
+        max_bytes: int = HTTP_CACHE_MAX_BYTES,
+        domain_ttls: dict[str, float] | None = None,
+    ):
+        """
+        Args:
+            path (str): The path of the SQLite database.
+            max_bytes (int): The maximum total size of the cached bodies.
+            domain_ttls (dict[str, float] | None): TTL overrides in seconds by domain.
+                Defaults to `HTTP_CACHE_DOMAIN_TTLS`.
+        """
+        self.store = SQLiteLRUStore(path, max_bytes, table="http_responses")
+        self.domain_ttls = (
+            domain_ttls if domain_ttls is not None else parse_domain_ttls(HTTP_CACHE_DOMAIN_TTLS)
+        )
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _domain_ttl(self, url: str) -> float | None:
+        host = urlsplit(url).hostname or ""
+        for domain, ttl in self.domain_ttls.items():
+            if host == domain or host.endswith("." + domain):
+                return ttl
+        return None
+
+    def _expires_at(self, url: str, headers) -> float:
+        now = time.time()
+        domain_ttl = self._domain_ttl(url)
+        if domain_ttl is not None:
+            return now + domain_ttl
+        directives = _cache_control(headers)
+        if "no-cache" in directives:
+            return now
+        if directives.get("max-age"):
+            try:
+                return now + float(directives["max-age"])
+            except ValueError:
+                return now
+        if headers.get("Expires"):
+            try:
+                return parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now
+
+    def _to_response(
+        self,
+        url: str,
+        body: bytes,
+        meta: dict,
+        max_bytes: int | None = None,
+        content_types: tuple[str, ...] | None = None,
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(meta["headers"])
+        content_type = response.headers.get("Content-Type", "").lower()
+        response.rejected = bool(
+            content_types and content_type and not content_type.startswith(content_types)
+        )
+        if response.rejected:
+            body = b""
+        response.truncated = max_bytes is not None and len(body) > max_bytes
+        if response.truncated:
+            body = body[:max_bytes]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response._content = body
+        return response
+
+    def _store(self, key: str, response: requests.Response, body: bytes) -> None:
+        if "no-store" in _cache_control(response.headers):
+            return
+        expires_at = self._expires_at(key, response.headers)
+        # Stale on arrival and without a validator, the entry could only ever be refetched in full
+        if expires_at <= time.time() and not (
+            "ETag" in response.headers or "Last-Modified" in response.headers
+        ):
+            return
+        meta = {
+            "headers": {
+                name: response.headers[name] for name in STORED_HEADERS if name in response.headers
+            },
+            "expires_at": expires_at,
+        }
+        self.store.put(key, body, meta)
+
+    def get(
+        self,
+        url: str,
+        max_bytes: int | None = None,
+        content_types: tuple[str, ...] | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Fetches a URL, serving it from the cache when possible.
+
+        `max_bytes` and `content_types` bound the download as in `fetch_limited`;
+        truncated and rejected bodies are not cached.
+
+        Args:
+            url (str): The URL to fetch.
+            max_bytes (int | None): The maximum size of the body to read.
+            content_types (tuple[str, ...] | None): The accepted `Content-Type` prefixes.
+            **kwargs: Additional arguments passed to `http_get`.
+        Returns:
+            requests.Response: The live or cached response.
+        """
+        key = normalize_url(url)
+        entry = self.store.get(key)
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry is not None:
+            body, meta = entry
+            if time.time() < meta["expires_at"]:
+                self._count("hits")
+                return self._to_response(url, body, meta, max_bytes, content_types)
+            if "ETag" in meta["headers"]:
+                headers["If-None-Match"] = meta["headers"]["ETag"]
+            if "Last-Modified" in meta["headers"]:
+                headers["If-Modified-Since"] = meta["headers"]["Last-Modified"]
+
+        response = fetch_limited(url, max_bytes, content_types, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self._count("revalidations")
+            meta["expires_at"] = self._expires_at(key, response.headers)
+            self.store.update_meta(key, meta)
+            return self._to_response(url, body, meta, max_bytes, content_types)
+
+        self._count("misses")
+        if response.status_code == 200 and not response.truncated and not response.rejected:
+            self._store(key, response, response.content)
+        return response
+
+    def stats(self) -> dict:
+        """
+        Returns the hit, revalidation and miss counters and the size of the cache.
+        """
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidations) / lookups if lookups else 0.0,
+            "bytes": self.store.total_bytes,
+        }
+
+    def drain_counters(self) -> dict[str, int]:
+        """
+        Returns the counters and resets them, so a worker process can report them to its parent.
+        """
+        with self._lock:
+            counters = {name: getattr(self, name) for name in ("hits", "revalidations", "misses")}
+            for name in counters:
+                setattr(self, name, 0)
+        return counters
+
+    def add_counters(self, counters: dict[str, int]) -> None:
+        """
+        Adds counters drained in a worker process to the counters of this cache.
+        """
+        with self._lock:
+            for name, count in counters.items():
+                setattr(self, name, getattr(self, name) + count)
+
+
+_http_cache: HTTPResponseCache | None = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPResponseCache | None:
+    """
+    Returns the process-wide HTTP cache, or None when `HTTP_CACHE_ENABLED` is off.
+
+    Returns:
+        HTTPResponseCache | None: The shared HTTP cache.
+    """
+    global _http_cache
+    if not HTTP_CACHE_ENABLED:
+        return None
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HTTPResponseCache()
+        return _http_cache
+
+
+def cached_get(
+    url: str,
+    max_bytes: int | None = None,
+    content_types: tuple[str, ...] | None = None,
+    **kwargs,
+) -> requests.Response:
+    """
+    Sends a GET request through the shared HTTP cache, or directly when it is disabled.
+
+    Args:
+        url (str): The URL to fetch.
+        max_bytes (int | None): The maximum size of the body to read.
+        content_types (tuple[str, ...] | None): The accepted `Content-Type` prefixes.
+        **kwargs: Additional arguments passed to `http_get`.
+    Returns:
+        requests.Response: The live or cached response.
+    """
+    cache = get_http_cache()
+    if cache is None:
+        return fetch_limited(url, max_bytes, content_types, **kwargs)
+    return cache.get(url, max_bytes, content_types, **kwargs)
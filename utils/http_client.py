@@ -0,0 +1,126 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", default=10))
+HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", default=30))
+HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", default=3))
+HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", default=16))
+HTTP_USER_AGENT: str = os.getenv(
+    "HTTP_USER_AGENT",
+    default="Mozilla/5.0 (compatible; hf-agents-gaia-agent/0.1.0; +https://github.com/zbloss/hf-agents-gaia-agent)",
+)
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def build_session() -> requests.Session:
+    """
+    Builds a session with pooled keep-alive connections and bounded retries.
+
+    Idempotent requests are retried with exponential backoff on connection
+    errors and on 429/5xx responses, honoring `Retry-After`. POST requests are
+    never retried, so a submission cannot be sent twice.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # One pool per host, each keeping up to HTTP_POOL_MAXSIZE sockets alive
+    adapter = HTTPAdapter(
+        pool_connections=HTTP_POOL_MAXSIZE,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": HTTP_USER_AGENT})
+    return session
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session, creating it on first use.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def http_get(url: str, timeout: float | tuple[float, float] | None = None, **kwargs) -> requests.Response:
+    """
+    Sends a GET request through the shared session.
+
+    Args:
+        url (str): The URL to fetch.
+        timeout (float | tuple[float, float] | None): The request timeout. Defaults to
+            `HTTP_CONNECT_TIMEOUT` and `HTTP_READ_TIMEOUT`.
+        **kwargs: Additional arguments passed to `requests.Session.get`.
+    Returns:
+        requests.Response: The response.
+    """
+    return get_session().get(
+        url, timeout=timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), **kwargs
+    )
+
+
+def http_post(url: str, timeout: float | tuple[float, float] | None = None, **kwargs) -> requests.Response:
+    """
+    Sends a POST request through the shared session.
+
+    Args:
+        url (str): The URL to post to.
+        timeout (float | tuple[float, float] | None): The request timeout. Defaults to
+            `HTTP_CONNECT_TIMEOUT` and `HTTP_READ_TIMEOUT`.
+        **kwargs: Additional arguments passed to `requests.Session.post`.
+    Returns:
+        requests.Response: The response.
+    """
+    return get_session().post(
+        url, timeout=timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), **kwargs
+    )
+
+
+def read_limited(response: requests.Response, max_bytes: int, chunk_size: int = 64 * 1024) -> bool:
+    """
+    Reads the body of a streamed response, stopping once `max_bytes` have arrived.
+
+    The body read so far becomes the response's `content`. When the body is
+    larger, the connection is closed instead of draining the rest of it.
+
+    Args:
+        response (requests.Response): A response requested with `stream=True`.
+        max_bytes (int): The maximum number of bytes to read.
+        chunk_size (int): The size of the chunks read from the socket.
+    Returns:
+        bool: Whether the body was truncated.
+    """
+    chunks = []
+    received = 0
+    truncated = False
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        chunks.append(chunk)
+        received += len(chunk)
+        if received > max_bytes:
+            truncated = True
+            break
+    response._content = b"".join(chunks)[:max_bytes]
+    response.close()
+    return truncated
@@ -0,0 +1,318 @@
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from multiprocessing.managers import BaseManager, BaseProxy
+from queue import Empty
+from typing import Callable
+
+from utils.rate_limiter import get_rate_limiter, set_rate_limiter
+
+TASK_TIMEOUT: float = float(os.getenv("TASK_TIMEOUT", default=0))
+TASK_MAX_STEPS: int | None = int(os.getenv("TASK_MAX_STEPS")) if os.getenv("TASK_MAX_STEPS") else None
+TIMEOUT_TRACE_PATH: str = os.getenv("TIMEOUT_TRACE_PATH", default=".cache/timeouts.jsonl")
+
+# Observations can be large, only their head is kept in the partial trace
+MAX_TRACE_CHARS: int = 2000
+
+
+class TaskTimeoutError(TimeoutError):
+    """Raised when an isolated task overruns its wall-clock deadline."""
+
+
+class TaskFailedError(RuntimeError):
+    """Raised when an isolated task raises or its worker process dies."""
+
+
+def _truncate(value, limit: int = MAX_TRACE_CHARS) -> str | None:
+    if value is None:
+        return None
+    text = str(value)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+class RateLimiterProxy(BaseProxy):
+    """
+    A proxy to a `RateLimiter` living in the parent process.
+    """
+
+    _exposed_ = ("acquire", "record_usage", "backoff", "__getattribute__")
+
+    def acquire(self, tokens: int) -> None:
+        return self._callmethod("acquire", (tokens,))
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        return self._callmethod("record_usage", (estimated_tokens, actual_tokens))
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        return self._callmethod("backoff", (attempt, retry_after))
+
+    @property
+    def max_retries(self) -> int:
+        return self._callmethod("__getattribute__", ("max_retries",))
+
+
+def _get_search_limiter():
+    # Imported on use: the tools package is not needed to serve the model limiter
+    from tools.web_search import get_search_limiter
+
+    return get_search_limiter()
+
+
+class LimiterManager(BaseManager):
+    """
+    Serves the parent's rate limiters to isolated workers, so every process
+    draws from the same model and search budgets.
+    """
+
+
+LimiterManager.register("rate_limiter", callable=get_rate_limiter, proxytype=RateLimiterProxy)
+LimiterManager.register("search_limiter", callable=_get_search_limiter, proxytype=RateLimiterProxy)
+
+_limiter_address = None
+_limiter_lock = threading.Lock()
+
+
+def serve_limiters():
+    """
+    Starts serving this process's rate limiters on a local socket, once.
+
+    The server runs in a daemon thread of this process, so workers draw from
+    the very limiters used by in-process agents.
+
+    Returns:
+        The address workers connect to.
+    """
+    global _limiter_address
+    with _limiter_lock:
+        if _limiter_address is None:
+            server = LimiterManager(authkey=multiprocessing.current_process().authkey).get_server()
+            threading.Thread(target=server.serve_forever, name="limiter-server", daemon=True).start()
+            _limiter_address = server.address
+        return _limiter_address
+
+
+def _drain_stats() -> dict:
+    """
+    Collects the cache counters and tracer latencies recorded in this worker since the last call.
+    """
+    from tools.web_search import drain_search_counters
+    from utils.http_cache import get_http_cache
+    from utils.llm_cache import get_llm_cache
+    from utils.tracing import get_tracer
+
+    stats = {"search": drain_search_counters()}
+    for name, holder in (("http", get_http_cache()), ("llm", get_llm_cache())):
+        if holder is not None:
+            stats[name] = holder.drain_counters()
+    tracer = get_tracer()
+    if tracer is not None:
+        stats["trace"] = tracer.drain_timings()
+    return stats
+
+
+def merge_stats(stats: dict) -> None:
+    """
+    Adds the counters and latencies reported by a worker to those of this process.
+    """
+    from tools.web_search import add_search_counters
+    from utils.http_cache import get_http_cache
+    from utils.llm_cache import get_llm_cache
+    from utils.tracing import get_tracer
+
+    add_search_counters(stats.get("search", {}))
+    for name, holder in (("http", get_http_cache()), ("llm", get_llm_cache())):
+        if holder is not None and name in stats:
+            holder.add_counters(stats[name])
+    tracer = get_tracer()
+    if tracer is not None and "trace" in stats:
+        tracer.add_timings(stats["trace"])
+
+
+def _worker(
+    agent_factory: Callable,
+    limiter_address,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+) -> None:
+    """
+    Builds one agent and runs the tasks sent to it until it receives None.
+
+    Each step is reported back to the parent as it finishes, and each outcome
+    is sent with the counters and latencies recorded while the task ran.
+    """
+    from tools.web_search import set_search_limiter
+
+    manager = LimiterManager(address=limiter_address)
+    manager.connect()
+    set_rate_limiter(manager.rate_limiter())
+    set_search_limiter(manager.search_limiter())
+
+    def report_step(memory_step) -> None:
+        results.put(
+            (
+                "step",
+                {
+                    "step": memory_step.step_number,
+                    "duration": memory_step.duration,
+                    "model_output": _truncate(memory_step.model_output),
+                    "observations": _truncate(memory_step.observations),
+                    "error": _truncate(memory_step.error),
+                },
+            )
+        )
+
+    agent = None
+    setup_error = None
+    try:
+        agent = agent_factory()
+        agent.agent.step_callbacks.append(report_step)
+    except Exception as e:
+        setup_error = f"{type(e).__name__}: {e}"
+
+    for task in iter(tasks.get, None):
+        prompt, task_id, max_steps = task
+        if setup_error is not None:
+            results.put(("error", setup_error, _drain_stats()))
+            continue
+        try:
+            answer = agent(prompt, task_id=task_id, max_steps=max_steps)
+            if not isinstance(answer, (int, float, bool)):
+                answer = str(answer)
+            results.put(("answer", answer, _drain_stats()))
+        except Exception as e:
+            results.put(("error", f"{type(e).__name__}: {e}", _drain_stats()))
+
+
+class IsolatedAgent:
+    """
+    Runs the tasks of an agent in a long-lived worker process with a deadline.
+
+    The worker builds its agent once with `agent_factory`, which must be
+    picklable (a module-level function such as `agents.build_default_agent`),
+    and keeps it, with its loaded models and caches, for every task of this
+    slot. Model and search calls draw from the parent's rate limiters, and
+    the counters and latencies of each task are merged into the parent's. A
+    task that overruns `timeout`, whether stuck in a network call, a browser
+    session or a generated code loop, is killed with its worker; the steps it
+    completed are appended to `TIMEOUT_TRACE_PATH`, a `TaskTimeoutError` is
+    raised for the runner to log, and a fresh worker takes over the next task.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable,
+        timeout: float | None = TASK_TIMEOUT or None,
+        max_steps: int | None = TASK_MAX_STEPS,
+        trace_path: str = TIMEOUT_TRACE_PATH,
+    ):
+        """
+        Args:
+            agent_factory (Callable): Builds the agent inside the worker process.
+            timeout (float | None): The wall-clock deadline of a task, in seconds.
+            max_steps (int | None): The step budget of a task; defaults to the agent's.
+            trace_path (str): The JSONL file partial traces of killed tasks go to.
+        """
+        self.agent_factory = agent_factory
+        self.timeout = timeout
+        self.max_steps = max_steps
+        self.trace_path = trace_path
+        # forkserver children do not inherit the threads of the runner's worker pool
+        start_method = "forkserver" if sys.platform != "win32" else "spawn"
+        self.context = multiprocessing.get_context(start_method)
+        self._process = None
+        self._tasks = None
+        self._results = None
+        # The worker builds its agent while the questions are being fetched
+        self._start()
+
+    def _start(self) -> None:
+        self._tasks = self.context.Queue()
+        self._results = self.context.Queue()
+        self._process = self.context.Process(
+            target=_worker,
+            args=(self.agent_factory, serve_limiters(), self._tasks, self._results),
+            daemon=True,
+        )
+        self._process.start()
+
+    def _record_partial_trace(self, task_id: str | None, steps: list[dict]) -> None:
+        if os.path.dirname(self.trace_path):
+            os.makedirs(os.path.dirname(self.trace_path), exist_ok=True)
+        with open(self.trace_path, "a", encoding="utf-8") as f:
+            record = {
+                "task_id": task_id,
+                "timeout": self.timeout,
+                "killed_at": time.time(),
+                "steps": steps,
+            }
+            f.write(json.dumps(record, default=str) + "\n")
+
+    def _stop(self) -> None:
+        process = self._process
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+        self._tasks.close()
+        self._results.close()
+        self._process = None
+
+    def close(self) -> None:
+        """
+        Asks the worker to exit once its current task is done, killing it if it does not.
+        """
+        if self._process is None:
+            return
+        self._tasks.put(None)
+        self._process.join(5)
+        self._stop()
+
+    def __call__(self, question: str, task_id: str | None = None):
+        """
+        Runs the agent on a question in the worker process.
+
+        Args:
+            question (str): The question to be answered.
+            task_id (str | None): The task ID, used for tracing.
+        Returns:
+            The answer to the question.
+        """
+        if self._process is None or not self._process.is_alive():
+            if self._process is not None:
+                self._stop()
+            self._start()
+        self._tasks.put((question, task_id, self.max_steps))
+        deadline = time.monotonic() + self.timeout if self.timeout else None
+        steps = []
+        while True:
+            wait = 1.0
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Killed mid-task, the worker may hold inconsistent state: the next task gets a new one
+                    self._stop()
+                    self._record_partial_trace(task_id, steps)
+                    raise TaskTimeoutError(
+                        f"Task timed out after {self.timeout:.0f}s ({len(steps)} steps completed)"
+                    )
+                wait = min(wait, remaining)
+            try:
+                message = self._results.get(timeout=wait)
+            except Empty:
+                if not self._process.is_alive():
+                    exitcode = self._process.exitcode
+                    self._stop()
+                    raise TaskFailedError(f"Worker process exited with code {exitcode}")
+                continue
+            kind, payload = message[0], message[1]
+            if kind == "step":
+                steps.append(payload)
+                continue
+            merge_stats(message[2])
+            if kind == "answer":
+                return payload
+            raise TaskFailedError(payload)
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import threading
+
+from utils.lru_store import SQLiteLRUStore
+
+LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", default="false").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH", default=".cache/llm_cache.sqlite3")
+LLM_CACHE_MAX_BYTES: int = int(os.getenv("LLM_CACHE_MAX_BYTES", default=512 * 1024 * 1024))
+
+
+class LLMResponseCache:
+    """
+    A content-addressed cache of model responses stored in SQLite.
+
+    Entries are keyed by a hash of everything that determines a completion, so
+    replaying an unchanged run serves every model call locally. The store is
+    bounded by `max_bytes` and evicts the least recently used entries first.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        Args:
+            path (str): The path of the SQLite database.
+            max_bytes (int): The maximum total size of the cached responses.
+        """
+        self.store = SQLiteLRUStore(path, max_bytes, table="llm_responses")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**parts) -> str | None:
+        """
+        Hashes the inputs of a model call into a cache key.
+
+        Args:
+            **parts: The message list, model ID, sampling parameters, etc.
+        Returns:
+            str | None: The key, or None when the inputs cannot be serialized
+                (e.g. messages carrying images), in which case the call is not cached.
+        """
+        try:
+            payload = json.dumps(parts, sort_keys=True)
+        except TypeError:
+            return None
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        """
+        Looks up a cached response and marks it as recently used.
+
+        Args:
+            key (str): The cache key.
+        Returns:
+            dict | None: The cached response, or None on a miss.
+        """
+        entry = self.store.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(entry[0])
+
+    def put(self, key: str, value: dict) -> None:
+        """
+        Stores a response, evicting the least recently used ones beyond the size limit.
+
+        Args:
+            key (str): The cache key.
+            value (dict): The JSON-serializable response.
+        """
+        self.store.put(key, json.dumps(value).encode("utf-8"))
+
+    def stats(self) -> dict:
+        """
+        Returns the hit/miss counters and the current size of the cache.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "bytes": self.store.total_bytes,
+        }
+
+    def drain_counters(self) -> dict[str, int]:
+        """
+        Returns the counters and resets them, so a worker process can report them to its parent.
+        """
+        with self._lock:
+            counters = {name: getattr(self, name) for name in ("hits", "misses")}
+            for name in counters:
+                setattr(self, name, 0)
+        return counters
+
+    def add_counters(self, counters: dict[str, int]) -> None:
+        """
+        Adds counters drained in a worker process to the counters of this cache.
+        """
+        with self._lock:
+            for name, count in counters.items():
+                setattr(self, name, getattr(self, name) + count)
+
+
+_llm_cache: LLMResponseCache | None = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache | None:
+    """
+    Returns the process-wide response cache, or None when `LLM_CACHE_ENABLED` is off.
+
+    Returns:
+        LLMResponseCache | None: The shared response cache.
+    """
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
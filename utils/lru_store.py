@@ -0,0 +1,110 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteLRUStore:
+    """
+    A thread-safe key/value store in SQLite, bounded in total size.
+
+    Each entry holds a binary value and a small JSON metadata dict. Once the
+    values exceed `max_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int, table: str = "entries"):
+        """
+        Args:
+            path (str): The path of the SQLite database.
+            max_bytes (int): The maximum total size of the stored values.
+            table (str): The table holding the entries.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.table = table
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    meta TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table} (last_access)"
+            )
+            self.total_bytes = self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {table}"
+            ).fetchone()[0]
+
+    def get(self, key: str) -> tuple[bytes, dict] | None:
+        """
+        Looks up an entry and marks it as recently used.
+
+        Args:
+            key (str): The entry key.
+        Returns:
+            tuple[bytes, dict] | None: The value and metadata, or None if absent.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, meta FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+        return bytes(row[0]), json.loads(row[1])
+
+    def put(self, key: str, value: bytes, meta: dict | None = None) -> None:
+        """
+        Stores an entry, evicting the least recently used ones beyond the size limit.
+
+        Args:
+            key (str): The entry key.
+            value (bytes): The value.
+            meta (dict | None): JSON-serializable metadata kept alongside the value.
+        """
+        with self._lock, self._conn:
+            previous = self._conn.execute(
+                f"SELECT size FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta or {}), len(value), time.time()),
+            )
+            self.total_bytes += len(value) - (previous[0] if previous else 0)
+            self._evict()
+
+    def update_meta(self, key: str, meta: dict) -> None:
+        """
+        Replaces the metadata of an entry without touching its value.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE {self.table} SET meta = ?, last_access = ? WHERE key = ?",
+                (json.dumps(meta), time.time(), key),
+            )
+
+    def _evict(self) -> None:
+        while self.total_bytes > self.max_bytes:
+            oldest = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.total_bytes -= size
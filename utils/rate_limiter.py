@@ -0,0 +1,196 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+LLM_REQUESTS_PER_MINUTE: int = int(os.getenv("LLM_REQUESTS_PER_MINUTE", default=30))
+LLM_TOKENS_PER_MINUTE: int = int(os.getenv("LLM_TOKENS_PER_MINUTE", default=1_000_000))
+
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously up to `capacity`.
+
+    Reservations are taken immediately and may drive the bucket negative;
+    the caller then waits until the debt has been refilled. A capacity of
+    zero or less disables the bucket.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self.updated_at) * self.refill_per_second,
+        )
+        self.updated_at = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Takes `amount` tokens from the bucket.
+
+        Args:
+            amount (float): The number of tokens to take.
+        Returns:
+            float: The number of seconds to wait before the reservation is covered.
+        """
+        if self.capacity <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+    def refund(self, amount: float) -> None:
+        """
+        Gives back tokens that were over-reserved (or takes more when negative).
+        """
+        if self.capacity <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    A thread-safe limiter enforcing request and token budgets per minute.
+
+    A single instance is meant to be shared by every agent in the process, so
+    that concurrent agents draw from the same provider quota and all pause
+    together when the provider answers with a 429.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = LLM_TOKENS_PER_MINUTE,
+        max_retries: int = 6,
+        base_backoff: float = 2.0,
+        max_backoff: float = 120.0,
+    ):
+        self.requests = TokenBucket(requests_per_minute, requests_per_minute / 60)
+        self.tokens = TokenBucket(tokens_per_minute, tokens_per_minute / 60)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int) -> None:
+        """
+        Blocks until one request and `tokens` tokens fit in the budget.
+
+        Args:
+            tokens (int): The estimated number of tokens the request will use.
+        """
+        with self._lock:
+            wait = self._blocked_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+        with self._lock:
+            wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        if wait > 0:
+            time.sleep(wait)
+
+        # A pause set by `backoff` while this caller slept on the budget applies to it too
+        while True:
+            with self._lock:
+                wait = self._blocked_until - time.monotonic()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """
+        Corrects the token budget once the real usage of a request is known.
+
+        Args:
+            estimated_tokens (int): The tokens reserved by `acquire`.
+            actual_tokens (int): The tokens reported by the provider.
+        """
+        with self._lock:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Pauses every caller after the provider rejected a request.
+
+        Args:
+            attempt (int): The zero-based retry attempt of the rejected request.
+            retry_after (float | None): The delay requested by the provider, if any.
+        Returns:
+            float: The number of seconds callers are paused for.
+        """
+        if retry_after is not None:
+            delay = retry_after + random.uniform(0, self.base_backoff)
+        else:
+            delay = random.uniform(
+                self.base_backoff, min(self.max_backoff, self.base_backoff * 2 ** (attempt + 1))
+            )
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return delay
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """
+    Reads the `Retry-After` header from the response attached to an error.
+
+    Args:
+        error (Exception): The error raised by the provider client.
+    Returns:
+        float | None: The requested delay in seconds, or None if there is none.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_rate_limiter: RateLimiter | None = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Returns the process-wide rate limiter, creating it on first use.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
+
+
+def set_rate_limiter(limiter: RateLimiter) -> None:
+    """
+    Replaces the process-wide rate limiter, e.g. with a proxy to the limiter of a parent process.
+
+    Args:
+        limiter (RateLimiter): The limiter every agent built afterwards draws from.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        _rate_limiter = limiter
@@ -0,0 +1,223 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from smolagents import Tool
+
+TRACE_ENABLED: bool = os.getenv("TRACE_ENABLED", default="false").lower() in ("1", "true", "yes")
+TRACE_PATH: str = os.getenv("TRACE_PATH", default=".cache/traces.jsonl")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Returns the nearest-rank percentile `q` (0-100) of a list of values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StepTracer:
+    """
+    Records where the time of each agent step goes.
+
+    For every step it writes one JSONL record with the model latency and token
+    counts, the wall time and output size of every tool call, and the size of
+    the observation. Tools and model calls report into a per-thread buffer, so
+    one tracer can be shared by agents running concurrently.
+    """
+
+    def __init__(self, path: str = TRACE_PATH):
+        """
+        Args:
+            path (str): The JSONL file the trace records are appended to.
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.tool_timings: dict[str, list[float]] = defaultdict(list)
+        self.model_latencies: list[float] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _buffer(self) -> dict:
+        if not hasattr(self._local, "buffer"):
+            self._local.task_id = None
+            self._local.buffer = {"model_calls": [], "tool_calls": []}
+        return self._local.buffer
+
+    def _write(self, record: dict) -> None:
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+    @contextmanager
+    def task(self, task_id: str | None):
+        """
+        Attributes the steps run by the current thread to a task.
+
+        Args:
+            task_id (str | None): The task ID.
+        """
+        self._buffer()
+        self._local.task_id = task_id
+        self._local.steps = 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._write(
+                {
+                    "type": "task",
+                    "task_id": task_id,
+                    "seconds": time.perf_counter() - start,
+                    "steps": self._local.steps,
+                }
+            )
+            self._local.task_id = None
+
+    def record_model_call(
+        self, seconds: float, input_tokens: int | None, output_tokens: int | None, cached: bool = False
+    ) -> None:
+        """
+        Records one model call made by the current thread.
+        """
+        self._buffer()["model_calls"].append(
+            {
+                "seconds": seconds,
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "cached": cached,
+            }
+        )
+        with self._lock:
+            self.model_latencies.append(seconds)
+
+    def wrap_tools(self, tools: list[Tool]) -> list[Tool]:
+        """
+        Instruments the `forward` method of each tool so its calls are timed.
+
+        Tools that are already instrumented are left untouched, so tool
+        instances shared between agents are only wrapped once.
+
+        Args:
+            tools (list[Tool]): The tools given to the agent.
+        Returns:
+            list[Tool]: The same tools, instrumented.
+        """
+        for tool in tools:
+            if getattr(tool, "_traced", False):
+                continue
+            tool.forward = self._timed(tool.name, tool.forward)
+            tool._traced = True
+        return tools
+
+    def _timed(self, tool_name: str, forward):
+        def timed_forward(*args, **kwargs):
+            start = time.perf_counter()
+            output = None
+            try:
+                output = forward(*args, **kwargs)
+                return output
+            finally:
+                seconds = time.perf_counter() - start
+                self._buffer()["tool_calls"].append(
+                    {
+                        "tool": tool_name,
+                        "seconds": seconds,
+                        "output_chars": len(str(output)) if output is not None else 0,
+                    }
+                )
+                with self._lock:
+                    self.tool_timings[tool_name].append(seconds)
+
+        return timed_forward
+
+    def step_callback(self, memory_step, agent) -> None:
+        """
+        Step callback writing the trace record of a finished step.
+
+        Args:
+            memory_step (ActionStep): The step that just finished.
+            agent (CodeAgent): The agent running the step.
+        """
+        buffer = self._buffer()
+        model_calls = buffer["model_calls"]
+        self._local.steps = getattr(self._local, "steps", 0) + 1
+        self._write(
+            {
+                "type": "step",
+                "task_id": self._local.task_id,
+                "step": memory_step.step_number,
+                "seconds": memory_step.duration,
+                "model_seconds": sum(call["seconds"] for call in model_calls),
+                "input_tokens": sum(call["input_tokens"] or 0 for call in model_calls),
+                "output_tokens": sum(call["output_tokens"] or 0 for call in model_calls),
+                "model_calls": model_calls,
+                "tool_calls": buffer["tool_calls"],
+                "observation_chars": len(memory_step.observations or ""),
+                "error": str(memory_step.error) if memory_step.error else None,
+            }
+        )
+        self._local.buffer = {"model_calls": [], "tool_calls": []}
+
+    def drain_timings(self) -> dict:
+        """
+        Returns the model and tool latencies recorded so far and resets them,
+        so a worker process can report them to its parent.
+        """
+        with self._lock:
+            timings = {"model": self.model_latencies, "tools": dict(self.tool_timings)}
+            self.model_latencies = []
+            self.tool_timings = defaultdict(list)
+        return timings
+
+    def add_timings(self, timings: dict) -> None:
+        """
+        Adds latencies drained in a worker process to this tracer's summary.
+        """
+        with self._lock:
+            self.model_latencies.extend(timings["model"])
+            for tool_name, seconds in timings["tools"].items():
+                self.tool_timings[tool_name].extend(seconds)
+
+    def summary(self) -> str:
+        """
+        Returns a p50/p95 latency summary of model calls and of each tool.
+        """
+        with self._lock:
+            rows = [("model", self.model_latencies)] + sorted(self.tool_timings.items())
+        lines = [f"{'name':<32}{'calls':>8}{'p50 (s)':>10}{'p95 (s)':>10}{'total (s)':>12}"]
+        for name, timings in rows:
+            if not timings:
+                continue
+            lines.append(
+                f"{name:<32}{len(timings):>8}{percentile(timings, 50):>10.2f}"
+                f"{percentile(timings, 95):>10.2f}{sum(timings):>12.2f}"
+            )
+        return "\n".join(lines)
+
+
+_tracer: StepTracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> StepTracer | None:
+    """
+    Returns the process-wide tracer, or None when `TRACE_ENABLED` is off.
+
+    Returns:
+        StepTracer | None: The shared tracer.
+    """
+    global _tracer
+    if not TRACE_ENABLED:
+        return None
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = StepTracer()
+        return _tracer
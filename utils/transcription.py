@@ -0,0 +1,175 @@
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.lru_store import SQLiteLRUStore
+from utils.whisper_models import WHISPER_MODEL_SIZE, get_whisper_model, transcribe_audio
+
+TRANSCRIPT_CACHE_PATH: str = os.getenv("TRANSCRIPT_CACHE_PATH", default=".cache/transcripts.sqlite3")
+TRANSCRIPT_CACHE_MAX_BYTES: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", default=64 * 1024 * 1024))
+# Each pool process holds its own copy of the whisper weights on top of the shared in-process
+# model (~140MB for "base", ~1.5GB for "medium"), so the pool is opt-in: 1 transcribes in-process
+TRANSCRIBE_WORKERS: int = int(os.getenv("TRANSCRIBE_WORKERS", default=1))
+# Whisper decodes 30s windows, so chunks are cut at the quietest point of their last half
+TRANSCRIBE_CHUNK_SECONDS: float = float(os.getenv("TRANSCRIBE_CHUNK_SECONDS", default=30))
+
+SAMPLE_RATE: int = 16_000
+FRAME_SECONDS: float = 0.03
+
+
+def file_sha256(file_name: str) -> str:
+    """
+    Hashes the content of a file.
+    """
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def split_on_silence(audio, chunk_seconds: float = TRANSCRIBE_CHUNK_SECONDS) -> list:
+    """
+    Splits audio into chunks of at most `chunk_seconds`, cutting at the quietest moments.
+
+    Each cut is placed at the 30ms frame of lowest energy in the second half
+    of the chunk, so words are rarely split between two chunks.
+
+    Args:
+        audio (np.ndarray): Mono float32 samples at 16kHz.
+        chunk_seconds (float): The maximum chunk length.
+    Returns:
+        list[np.ndarray]: The chunks, in order.
+    """
+    import numpy as np
+
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    chunk = int(SAMPLE_RATE * chunk_seconds)
+    chunks = []
+    start = 0
+    while len(audio) - start > chunk:
+        window = audio[start + chunk // 2 : start + chunk]
+        frames = window[: len(window) // frame * frame].reshape(-1, frame)
+        quietest = int(np.argmin(np.sqrt(np.mean(frames**2, axis=1))))
+        end = start + chunk // 2 + quietest * frame + frame // 2
+        chunks.append(audio[start:end])
+        start = end
+    chunks.append(audio[start:])
+    return chunks
+
+
+_worker_size: str = WHISPER_MODEL_SIZE
+
+
+def _init_worker(size: str, threads: int) -> None:
+    """
+    Loads the whisper model once in each pool process.
+    """
+    global _worker_size
+    import torch
+
+    # Share the cores between the workers instead of each using all of them
+    torch.set_num_threads(threads)
+    _worker_size = size
+    get_whisper_model(size)
+
+
+def _transcribe_chunk(audio) -> str:
+    return get_whisper_model(_worker_size).transcribe(audio)["text"].strip()
+
+
+class Transcriber:
+    """
+    Transcribes audio files in parallel chunks and caches the transcripts on disk.
+
+    Transcripts are keyed by the file's sha256 and the model size, so reopening
+    a file, in a later step or a later run, is a cache lookup. By default a
+    file is transcribed in-process with the shared model. With more than one
+    worker, long files are split on silence and their chunks transcribed across
+    a pool of processes, each holding its own copy of the model in addition to
+    the shared one; the pool is kept for the next file.
+    """
+
+    def __init__(
+        self,
+        size: str = WHISPER_MODEL_SIZE,
+        workers: int = TRANSCRIBE_WORKERS,
+        cache_path: str = TRANSCRIPT_CACHE_PATH,
+        cache_max_bytes: int = TRANSCRIPT_CACHE_MAX_BYTES,
+    ):
+        """
+        Args:
+            size (str): The whisper model size.
+            workers (int): The number of transcription processes; 1 transcribes in-process
+                with the shared model, more trade one copy of the weights per process for speed.
+            cache_path (str): The path of the SQLite transcript cache.
+            cache_max_bytes (int): The maximum total size of the cached transcripts.
+        """
+        self.size = size
+        self.workers = workers
+        self.cache = SQLiteLRUStore(cache_path, cache_max_bytes, table="transcripts")
+        self._pool: ProcessPoolExecutor | None = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # forkserver children do not inherit the threads of the agent runner
+                start_method = "forkserver" if sys.platform != "win32" else "spawn"
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(start_method),
+                    initializer=_init_worker,
+                    initargs=(self.size, max(1, (os.cpu_count() or 1) // self.workers)),
+                )
+            return self._pool
+
+    def transcribe(self, file_name: str) -> str:
+        """
+        Returns the transcript of an audio file.
+
+        Args:
+            file_name (str): The path of the audio file.
+        Returns:
+            str: The transcribed text.
+        """
+        key = f"{file_sha256(file_name)}:{self.size}"
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry[0].decode("utf-8")
+
+        # Daemonic processes, such as isolated task workers, cannot start a pool
+        if self.workers <= 1 or multiprocessing.current_process().daemon:
+            text = transcribe_audio(file_name, self.size)
+        else:
+            import whisper
+
+            chunks = split_on_silence(whisper.load_audio(file_name))
+            if len(chunks) == 1:
+                text = transcribe_audio(file_name, self.size)
+            else:
+                text = " ".join(self._get_pool().map(_transcribe_chunk, chunks))
+
+        self.cache.put(key, text.encode("utf-8"), {"file_name": os.path.basename(file_name)})
+        return text
+
+
+_transcriber: Transcriber | None = None
+_transcriber_lock = threading.Lock()
+
+
+def get_transcriber() -> Transcriber:
+    """
+    Returns the process-wide transcriber, creating it on first use.
+
+    Returns:
+        Transcriber: The shared transcriber.
+    """
+    global _transcriber
+    with _transcriber_lock:
+        if _transcriber is None:
+            _transcriber = Transcriber()
+        return _transcriber
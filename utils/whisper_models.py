@@ -0,0 +1,102 @@
+import os
+import threading
+
+WHISPER_MODEL_SIZE: str = os.getenv("WHISPER_MODEL_SIZE", default="base")
+WHISPER_PRELOAD: bool = os.getenv("WHISPER_PRELOAD", default="true").lower() in ("1", "true", "yes")
+
+AUDIO_EXTENSIONS: tuple[str, ...] = (".mp3", ".wav", ".m4a", ".flac", ".ogg")
+
+_models: dict[str, object] = {}
+# One lock per model size: held while the model loads, then while it transcribes
+_model_locks: dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _model_lock(size: str) -> threading.Lock:
+    with _registry_lock:
+        if size not in _model_locks:
+            _model_locks[size] = threading.Lock()
+        return _model_locks[size]
+
+
+def get_whisper_model(size: str = WHISPER_MODEL_SIZE):
+    """
+    Returns the process-wide whisper model of a size, loading it on first use.
+
+    Concurrent callers asking for a model being loaded wait for that load
+    instead of starting their own, so the weights are held in memory once.
+
+    Args:
+        size (str): The whisper model size, e.g. "base" or "small".
+    Returns:
+        whisper.Whisper: The model.
+    """
+    model = _models.get(size)
+    if model is not None:
+        return model
+    with _model_lock(size):
+        if size not in _models:
+            # whisper pulls in torch, so it is only imported once audio is needed
+            import whisper
+
+            print(f"Loading whisper model '{size}'...")
+            _models[size] = whisper.load_model(size)
+        return _models[size]
+
+
+def transcribe_audio(file_name: str, size: str = WHISPER_MODEL_SIZE) -> str:
+    """
+    Transcribes an audio file with the shared whisper model.
+
+    whisper installs decoding hooks on the model during `transcribe`, so calls
+    sharing a model are serialized.
+
+    Args:
+        file_name (str): The path of the audio file.
+        size (str): The whisper model size.
+    Returns:
+        str: The transcribed text.
+    """
+    model = get_whisper_model(size)
+    with _model_lock(size):
+        return model.transcribe(file_name)["text"]
+
+
+def questions_need_audio(questions: list[dict]) -> bool:
+    """
+    Tells whether any question comes with an audio attachment.
+    """
+    return any(
+        (question.get("file_name") or "").lower().endswith(AUDIO_EXTENSIONS)
+        for question in questions
+    )
+
+
+def preload_whisper_model(
+    questions: list[dict], size: str = WHISPER_MODEL_SIZE
+) -> threading.Thread | None:
+    """
+    Starts loading the whisper model in the background when the questions include audio.
+
+    Only useful when agents run in this process: each isolated worker
+    (`utils.isolation.IsolatedAgent`) loads its own copy on its first audio
+    task and keeps it for the following ones.
+
+    Args:
+        questions (list[dict]): The questions about to be answered.
+        size (str): The whisper model size.
+    Returns:
+        threading.Thread | None: The loading thread, or None if nothing is preloaded.
+    """
+    if not WHISPER_PRELOAD or not questions_need_audio(questions):
+        return None
+
+    def load() -> None:
+        try:
+            get_whisper_model(size)
+        except Exception as e:
+            print(f"Error preloading whisper model '{size}': {e}")
+
+    thread = threading.Thread(target=load, name="whisper-preload", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,423 @@
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import parse_qs, unquote, urlsplit
+
+WIKIPEDIA_SNAPSHOT_DIR: str | None = os.getenv("WIKIPEDIA_SNAPSHOT_DIR")
+# When set, pages missing from the snapshot are reported instead of fetched live
+WIKIPEDIA_OFFLINE: bool = os.getenv("WIKIPEDIA_OFFLINE", default="false").lower() in ("1", "true", "yes")
+
+ARTICLES_FILE: str = "articles.bin"
+INDEX_FILE: str = "titles.idx"
+META_FILE: str = "meta.json"
+# Symlink to the build readers use; swapping it publishes a new build in one rename
+CURRENT_LINK: str = "current"
+SNAPSHOT_FORMAT: int = 2
+
+# Redirect blobs hold "#REDIRECT <alias>\n<target>"; MediaWiki titles cannot start with "#"
+REDIRECT_PREFIX: str = "#REDIRECT "
+MAX_REDIRECT_HOPS: int = 5
+
+# Index records: title hash, blob offset, blob length; sorted by hash
+INDEX_RECORD = struct.Struct(">QQI")
+
+
+class ArticleNotInSnapshotError(LookupError):
+    """Raised in offline mode for pages the snapshot does not hold."""
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes an article title the way MediaWiki does.
+
+    Percent-escapes are decoded, underscores become spaces, whitespace is
+    collapsed and the first letter is capitalized.
+
+    Args:
+        title (str): The title, as written or as found in a URL.
+    Returns:
+        str: The normalized title.
+    """
+    title = re.sub(r"\s+", " ", unquote(title).replace("_", " ")).strip()
+    return title[:1].upper() + title[1:]
+
+
+def title_hash(title: str) -> int:
+    """
+    Returns the 64-bit index key of a title.
+    """
+    digest = hashlib.blake2b(normalize_title(title).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def title_from_url(url: str, language: str = "en") -> str | None:
+    """
+    Extracts the article title from a Wikipedia URL.
+
+    Args:
+        url (str): The URL, e.g. "https://en.wikipedia.org/wiki/Mercedes_Sosa".
+        language (str): The language edition the URL must belong to.
+    Returns:
+        str | None: The title, or None if the URL is not an article of that edition.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+    if host not in (f"{language}.wikipedia.org", f"{language}.m.wikipedia.org"):
+        return None
+    if parts.path.startswith("/wiki/"):
+        return normalize_title(parts.path[len("/wiki/") :])
+    titles = parse_qs(parts.query).get("title")
+    return normalize_title(titles[0]) if titles else None
+
+
+def resolve_snapshot_dir(path: str) -> str:
+    """
+    Returns the build directory a snapshot directory currently points to.
+
+    Snapshots written before builds were versioned keep their files directly
+    in `path`.
+    """
+    link = os.path.join(path, CURRENT_LINK)
+    return os.path.realpath(link) if os.path.lexists(link) else path
+
+
+class WikipediaSnapshot:
+    """
+    A read-only, revision-pinned set of Wikipedia articles on disk.
+
+    Articles and redirects are zlib-compressed into a single blob file. A
+    sorted index of fixed-width records maps title hashes to blob offsets.
+    Both files are memory-mapped, so a lookup is a binary search over the page
+    cache plus one decompression, without loading the store into memory. Each
+    blob starts with its title, which is checked against the title looked up,
+    so a hash collision is a miss rather than the wrong article.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The snapshot directory written by `build_snapshot`.
+        """
+        self.path = path
+        # Resolved once, so all three files come from the same build even if a new one is swapped in
+        build_dir = resolve_snapshot_dir(path)
+        with open(os.path.join(build_dir, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.language = self.meta.get("language", "en")
+        # Older snapshots point redirects straight at the article, so their titles cannot be checked
+        self._checked = self.meta.get("format", 1) >= SNAPSHOT_FORMAT
+        self._index = self._map(os.path.join(build_dir, INDEX_FILE))
+        self._articles = self._map(os.path.join(build_dir, ARTICLES_FILE))
+        self._count = len(self._index) // INDEX_RECORD.size if self._index else 0
+
+    @staticmethod
+    def _map(path: str) -> mmap.mmap | None:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, title: str) -> bool:
+        return self.get(title) is not None
+
+    def _find(self, key: int) -> tuple[int, int] | None:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            current, offset, length = INDEX_RECORD.unpack_from(
+                self._index, middle * INDEX_RECORD.size
+            )
+            if current == key:
+                return offset, length
+            if current < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def get(self, title: str) -> tuple[str, str] | None:
+        """
+        Looks up an article by title, following redirects.
+
+        Args:
+            title (str): The article title.
+        Returns:
+            tuple[str, str] | None: The canonical title and the article HTML, or None if absent.
+        """
+        title = normalize_title(title)
+        for _ in range(MAX_REDIRECT_HOPS + 1):
+            found = self._find(title_hash(title))
+            if found is None:
+                return None
+            offset, length = found
+            blob = zlib.decompress(self._articles[offset : offset + length]).decode("utf-8")
+            header, _, body = blob.partition("\n")
+            if header.startswith(REDIRECT_PREFIX):
+                if header[len(REDIRECT_PREFIX) :] != title:
+                    return None
+                title = body
+                continue
+            if self._checked and header != title:
+                return None
+            return header, body
+        return None
+
+    def get_url(self, url: str) -> tuple[str, str] | None:
+        """
+        Looks up the article a Wikipedia URL points to.
+
+        Args:
+            url (str): The article URL.
+        Returns:
+            tuple[str, str] | None: The canonical title and the article HTML, or None if
+                the URL is not an article of this snapshot.
+        """
+        title = title_from_url(url, self.language)
+        return self.get(title) if title else None
+
+
+def _ensure_content_div(html: str) -> str:
+    # Parsoid HTML from the dumps lacks the wrapper the parser tools look for
+    if 'id="mw-content-text"' in html or "id='mw-content-text'" in html:
+        return html
+    return f'<div id="mw-content-text">{html}</div>'
+
+
+def iter_html_dir(html_dir: str) -> Iterator[tuple[str, str, list[str]]]:
+    """
+    Yields the articles of a directory of saved pages, titled by file name.
+
+    Args:
+        html_dir (str): A directory of `<Title>.html` files, e.g. "Mercedes_Sosa.html", or
+            pages saved from a browser, e.g. "Mercedes Sosa - Wikipedia.html".
+    Yields:
+        tuple[str, str, list[str]]: The title, the HTML and its redirects (none).
+    """
+    for path in sorted(Path(html_dir).rglob("*.htm*")):
+        title = normalize_title(path.stem.removesuffix(" - Wikipedia"))
+        yield title, path.read_text(encoding="utf-8", errors="replace"), []
+
+
+def iter_ndjson_dump(path: str) -> Iterator[tuple[str, str, list[str]]]:
+    """
+    Yields the main-namespace articles of a Wikimedia Enterprise HTML dump file.
+
+    Args:
+        path (str): An extracted `.ndjson` file of the dump, optionally gzipped.
+    Yields:
+        tuple[str, str, list[str]]: The title, the HTML and the titles redirecting to it.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("namespace", {}).get("identifier", 0) != 0:
+                continue
+            html = record.get("article_body", {}).get("html")
+            if not html:
+                continue
+            redirects = [redirect["name"] for redirect in record.get("redirects", [])]
+            yield normalize_title(record["name"]), html, redirects
+
+
+def read_redirects(path: str) -> Iterator[tuple[str, str]]:
+    """
+    Reads a tab-separated file of `source<TAB>target` title pairs.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            source, _, target = line.rstrip("\n").partition("\t")
+            if source and target:
+                yield source, target
+
+
+def build_snapshot(
+    out_dir: str,
+    html_dir: str | None = None,
+    ndjson_paths: list[str] | None = None,
+    redirects_path: str | None = None,
+    revision: str | None = None,
+    language: str = "en",
+) -> dict:
+    """
+    Ingests articles into a snapshot directory readable by `WikipediaSnapshot`.
+
+    Each build is written to its own subdirectory, then published by
+    atomically replacing the `current` symlink, so a reader sees either the
+    previous build or the new one, never a mix of their files. The build
+    before the new one is kept for readers still opening it; older ones are
+    removed.
+
+    Args:
+        out_dir (str): The snapshot directory.
+        html_dir (str | None): A directory of saved article pages.
+        ndjson_paths (list[str] | None): Wikimedia Enterprise HTML dump files.
+        redirects_path (str | None): A tab-separated file of extra redirects.
+        revision (str | None): A label of the pinned revision, e.g. "2022-12-31".
+        language (str): The language edition of the articles.
+    Returns:
+        dict: The metadata of the snapshot.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    build_dir = os.path.join(out_dir, f"build-{time.time_ns()}")
+    os.makedirs(build_dir)
+    try:
+        meta = _write_build(
+            build_dir, html_dir, ndjson_paths or [], redirects_path, revision, language
+        )
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    link = os.path.join(out_dir, CURRENT_LINK)
+    previous = os.path.realpath(link) if os.path.lexists(link) else None
+    link_tmp = os.path.join(out_dir, f".{CURRENT_LINK}.{os.getpid()}")
+    os.symlink(os.path.basename(build_dir), link_tmp)
+    os.replace(link_tmp, link)
+
+    keep = {os.path.realpath(build_dir), previous}
+    for entry in os.scandir(out_dir):
+        if entry.name.startswith("build-") and entry.is_dir() and os.path.realpath(entry.path) not in keep:
+            shutil.rmtree(entry.path, ignore_errors=True)
+    # Files of the unversioned layout are superseded; open memory maps stay valid
+    for name in (ARTICLES_FILE, INDEX_FILE, META_FILE):
+        if os.path.isfile(os.path.join(out_dir, name)):
+            os.remove(os.path.join(out_dir, name))
+    return meta
+
+
+def _write_build(
+    build_dir: str,
+    html_dir: str | None,
+    ndjson_paths: list[str],
+    redirects_path: str | None,
+    revision: str | None,
+    language: str,
+) -> dict:
+    sources = [iter_html_dir(html_dir)] if html_dir else []
+    sources.extend(iter_ndjson_dump(path) for path in ndjson_paths)
+
+    entries: dict[int, tuple[int, int]] = {}
+    titles: dict[int, str] = {}
+    redirects: list[tuple[str, str]] = []
+    articles = 0
+    collisions = 0
+    with open(os.path.join(build_dir, ARTICLES_FILE), "wb") as f:
+
+        def add(title: str, text: str) -> None:
+            nonlocal collisions
+            key = title_hash(title)
+            if key in titles and titles[key] != title:
+                collisions += 1
+                return
+            blob = zlib.compress(text.encode("utf-8"), 6)
+            entries[key] = (f.tell(), len(blob))
+            titles[key] = title
+            f.write(blob)
+
+        for source in sources:
+            for title, html, aliases in source:
+                add(title, f"{title}\n{_ensure_content_div(html)}")
+                articles += 1
+                redirects.extend((alias, title) for alias in aliases)
+        if redirects_path:
+            redirects.extend(read_redirects(redirects_path))
+        for source, target in redirects:
+            source, target = normalize_title(source), normalize_title(target)
+            # An article always wins over a redirect of the same title
+            if title_hash(source) not in titles and title_hash(target) in titles:
+                add(source, f"{REDIRECT_PREFIX}{source}\n{target}")
+
+    with open(os.path.join(build_dir, INDEX_FILE), "wb") as f:
+        for key in sorted(entries):
+            f.write(INDEX_RECORD.pack(key, *entries[key]))
+
+    meta = {
+        "format": SNAPSHOT_FORMAT,
+        "revision": revision,
+        "language": language,
+        "articles": articles,
+        "titles": len(entries),
+        "hash_collisions": collisions,
+        "built_at": time.time(),
+    }
+    with open(os.path.join(build_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+_snapshot: WikipediaSnapshot | None = None
+_snapshot_lock = threading.Lock()
+
+
+def get_wikipedia_snapshot() -> WikipediaSnapshot | None:
+    """
+    Returns the process-wide snapshot, or None when `WIKIPEDIA_SNAPSHOT_DIR` is unset.
+
+    Returns:
+        WikipediaSnapshot | None: The shared snapshot.
+    """
+    global _snapshot
+    if not WIKIPEDIA_SNAPSHOT_DIR:
+        return None
+    with _snapshot_lock:
+        if _snapshot is None:
+            _snapshot = WikipediaSnapshot(WIKIPEDIA_SNAPSHOT_DIR)
+        return _snapshot
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build or query a local Wikipedia snapshot.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Ingest articles into a snapshot directory.")
+    build.add_argument("out_dir")
+    build.add_argument("--html-dir", help="Directory of saved <Title>.html pages.")
+    build.add_argument(
+        "--ndjson", nargs="*", default=[], help="Wikimedia Enterprise HTML dump files."
+    )
+    build.add_argument("--redirects", help="Tab-separated file of source/target titles.")
+    build.add_argument("--revision", help='Label of the pinned revision, e.g. "2022-12-31".')
+    build.add_argument("--language", default="en")
+
+    get = commands.add_parser("get", help="Print an article of a snapshot.")
+    get.add_argument("snapshot_dir")
+    get.add_argument("title")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        if not args.html_dir and not args.ndjson:
+            parser.error("build needs --html-dir or --ndjson")
+        start = time.perf_counter()
+        meta = build_snapshot(
+            args.out_dir,
+            html_dir=args.html_dir,
+            ndjson_paths=args.ndjson,
+            redirects_path=args.redirects,
+            revision=args.revision,
+            language=args.language,
+        )
+        print(f"Built snapshot in {time.perf_counter() - start:.1f}s: {meta}")
+    else:
+        page = WikipediaSnapshot(args.snapshot_dir).get(args.title)
+        if page is None:
+            raise SystemExit(f"'{args.title}' is not in the snapshot")
+        print(f"{page[0]}\n\n{page[1]}")
+
+
+if __name__ == "__main__":
+    main()